@@ -1,25 +1,34 @@
 import pygame
 import math
+from pool import Pool
+from quality import quality_governor
+from sprite_cache import sprite_cache, SpriteSheet
+from text_cache import text_cache
 
 class Animation:
     def __init__(self, x, y, animation_type, duration=30):
+        # Animation types
+        self.EXPLOSION = 0
+        self.HIT = 1
+        self.POWERUP = 2
+        self.TEXT = 3
+        
+        self.font = text_cache.font(24)
+        self.reset(x, y, animation_type, duration)
+        
+    def reset(self, x, y, animation_type, duration=30):
+        """Reinitialise a pooled animation"""
         self.x = x
         self.y = y
         self.type = animation_type
         self.duration = duration
         self.current_frame = 0
         self.finished = False
-        
-        # Animation types
-        self.EXPLOSION = 0
-        self.HIT = 1
-        self.POWERUP = 2
-        self.TEXT = 3
+        self.frames = None  # Baked frame sequence, looked up on first draw
         
         # Text for text animations
         self.text = ""
         self.color = (255, 255, 255)
-        self.font = pygame.font.SysFont(None, 24)
         
     def update(self):
         """Update animation frame"""
@@ -28,131 +37,147 @@ class Animation:
             self.finished = True
             
     def draw(self, screen):
-        """Draw the animation based on its type"""
-        if self.type == self.EXPLOSION:
-            self._draw_explosion(screen)
-        elif self.type == self.HIT:
-            self._draw_hit(screen)
-        elif self.type == self.POWERUP:
-            self._draw_powerup(screen)
-        elif self.type == self.TEXT:
-            self._draw_text(screen)
-            
-    def _draw_explosion(self, screen):
-        """Draw explosion animation"""
-        # Calculate size based on current frame
-        progress = self.current_frame / self.duration
-        size = int(30 * progress)
-        alpha = int(255 * (1 - progress))
-        
-        # Create a surface with alpha channel
-        surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+        """Draw the animation based on its type, returning the area drawn over"""
+        return screen.blit(*self.get_blit())
         
-        # Draw explosion circles with decreasing alpha
-        pygame.draw.circle(surf, (255, 165, 0, alpha), (size, size), size)
-        pygame.draw.circle(surf, (255, 0, 0, alpha), (size, size), int(size * 0.7))
-        
-        # Draw the surface to the screen
-        screen.blit(surf, (self.x - size, self.y - size))
-        
-    def _draw_hit(self, screen):
-        """Draw hit animation"""
-        # Calculate size and alpha based on current frame
-        progress = self.current_frame / self.duration
-        size = int(10 * (1 - progress))
-        alpha = int(255 * (1 - progress))
-        
-        # Create a surface with alpha channel
-        surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
-        
-        # Draw hit effect (X shape)
-        pygame.draw.line(surf, (255, 255, 255, alpha), 
-                        (0, 0), (size * 2, size * 2), 2)
-        pygame.draw.line(surf, (255, 255, 255, alpha), 
-                        (0, size * 2), (size * 2, 0), 2)
-        
-        # Draw the surface to the screen
-        screen.blit(surf, (self.x - size, self.y - size))
-        
-    def _draw_powerup(self, screen):
-        """Draw powerup animation"""
-        # Calculate size and alpha based on current frame
-        progress = self.current_frame / self.duration
-        size = int(20 * (1 - progress))
-        alpha = int(255 * (1 - progress))
-        
-        # Create a surface with alpha channel
-        surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+    def get_blit(self):
+        """Return the surface to draw this frame and where to draw it"""
+        if self.type == self.TEXT:
+            return self._text_blit()
+            
+        # Every other type only depends on the frame index, so it plays a sequence baked on first use
+        if self.frames is None:
+            self.frames = sprite_cache.get(('animation', self.type, self.duration), self._bake_frames)
+        frame = self.frames[min(self.current_frame, len(self.frames) - 1)]
         
-        # Draw powerup effect (expanding circle)
-        pygame.draw.circle(surf, (255, 255, 0, alpha), (size, size), size, 2)
+        # Frames are square and centered on the animation
+        size = frame.get_width() // 2
+        return frame, (self.x - size, self.y - size)
         
-        # Draw the surface to the screen
-        screen.blit(surf, (self.x - size, self.y - size))
+    def _bake_frames(self):
+        """Render every frame of this animation's type and duration into a sprite sheet"""
+        if self.type == self.EXPLOSION:
+            render = render_explosion
+        elif self.type == self.HIT:
+            render = render_hit
+        else:
+            render = render_powerup
+        return SpriteSheet([render(frame / self.duration) for frame in range(self.duration)])
         
-    def _draw_text(self, screen):
-        """Draw floating text animation"""
+    def _text_blit(self):
+        """Render this frame of the floating text animation"""
         # Calculate position and alpha based on current frame
         progress = self.current_frame / self.duration
         y_offset = int(20 * progress)
         alpha = int(255 * (1 - progress))
         
         # Create text surface
-        text_surf = self.font.render(self.text, True, self.color)
+        text_surf = text_cache.render(self.font, self.text, True, self.color)
         
         # Create a surface with alpha channel
         surf = pygame.Surface((text_surf.get_width(), text_surf.get_height()), pygame.SRCALPHA)
         surf.fill((0, 0, 0, 0))  # Fill with transparent color
         
-        # Blit text to surface with alpha
+        # Blit text to surface with alpha, leaving the shared cached surface as it was
+        opacity = text_surf.get_alpha()
         text_surf.set_alpha(alpha)
         surf.blit(text_surf, (0, 0))
+        text_surf.set_alpha(opacity)
         
-        # Draw the surface to the screen
-        screen.blit(surf, (self.x - text_surf.get_width() // 2, self.y - y_offset))
+        return surf, (self.x - text_surf.get_width() // 2, self.y - y_offset)
         
     def set_text(self, text, color=(255, 255, 255), size=24):
         """Set text for text animations"""
         self.text = text
         self.color = color
-        self.font = pygame.font.SysFont(None, size)
+        self.font = text_cache.font(size)
         
 class AnimationManager:
     def __init__(self):
-        self.animations = []
+        self.animations = Pool(Animation)
         
     def add_explosion(self, x, y, duration=30):
         """Add explosion animation"""
-        anim = Animation(x, y, 0, duration)
-        self.animations.append(anim)
+        self.animations.acquire(x, y, 0, duration)
         
     def add_hit(self, x, y, duration=15):
         """Add hit animation"""
-        anim = Animation(x, y, 1, duration)
-        self.animations.append(anim)
+        self.animations.acquire(x, y, 1, duration)
         
     def add_powerup(self, x, y, duration=30):
         """Add powerup animation"""
-        anim = Animation(x, y, 2, duration)
-        self.animations.append(anim)
+        self.animations.acquire(x, y, 2, duration)
         
     def add_text(self, x, y, text, color=(255, 255, 255), size=24, duration=60):
         """Add floating text animation"""
-        anim = Animation(x, y, 3, duration)
+        anim = self.animations.acquire(x, y, 3, duration)
         anim.set_text(text, color, size)
-        self.animations.append(anim)
         
     def update(self):
-        """Update all animations and remove finished ones"""
-        for anim in self.animations[:]:
+        """Update all animations and release finished ones"""
+        for anim in self.animations:
             anim.update()
             if anim.finished:
-                self.animations.remove(anim)
+                self.animations.release(anim)
+        self.animations.compact()
                 
-    def draw(self, screen):
-        """Draw all active animations"""
-        for anim in self.animations:
-            anim.draw(screen)
+    def draw(self, screen, animations=None):
+        """Draw all active animations in one blits call, returning the areas drawn over.
+        
+        animations are copies of them to draw instead, taken for pipelined
+        rendering (see pipeline.py).
+        """
+        if animations is None:
+            animations = self.animations
+        if quality_governor.enabled('effects'):
+            return screen.blits(anim.get_blit() for anim in animations)
+            
+        # Explosions and hits are left out at low quality, texts and pickups still show
+        return screen.blits(anim.get_blit() for anim in animations
+                            if anim.type not in (anim.EXPLOSION, anim.HIT))
             
+def render_explosion(progress):
+    """Explosion frame: orange and red discs, growing and fading out"""
+    # Calculate size based on current frame
+    size = int(30 * progress)
+    alpha = int(255 * (1 - progress))
+    
+    # Create a surface with alpha channel
+    surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+    
+    # Draw explosion circles with decreasing alpha
+    pygame.draw.circle(surf, (255, 165, 0, alpha), (size, size), size)
+    pygame.draw.circle(surf, (255, 0, 0, alpha), (size, size), int(size * 0.7))
+    return surf
+    
+def render_hit(progress):
+    """Hit frame: a white X, shrinking and fading out"""
+    # Calculate size and alpha based on current frame
+    size = int(10 * (1 - progress))
+    alpha = int(255 * (1 - progress))
+    
+    # Create a surface with alpha channel
+    surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+    
+    # Draw hit effect (X shape)
+    pygame.draw.line(surf, (255, 255, 255, alpha), 
+                    (0, 0), (size * 2, size * 2), 2)
+    pygame.draw.line(surf, (255, 255, 255, alpha), 
+                    (0, size * 2), (size * 2, 0), 2)
+    return surf
+    
+def render_powerup(progress):
+    """Power-up frame: a yellow ring, shrinking and fading out"""
+    # Calculate size and alpha based on current frame
+    size = int(20 * (1 - progress))
+    alpha = int(255 * (1 - progress))
+    
+    # Create a surface with alpha channel
+    surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+    
+    # Draw powerup effect (expanding circle)
+    pygame.draw.circle(surf, (255, 255, 0, alpha), (size, size), size, 2)
+    return surf
+    
 # Create a global instance
 animation_manager = AnimationManager()
@@ -0,0 +1,110 @@
+"""Pack every image in assets/images into one texture atlas.
+
+Writes assets/atlas.png with all images side by side and assets/atlas.json
+mapping each file name to its rectangle in the atlas. At runtime the
+sprite cache loads and converts the atlas once and hands out subsurfaces
+by file name, instead of opening and decoding each image separately.
+Run from the src directory after adding or changing an image:
+
+    python atlas_packer.py
+    python atlas_packer.py --max-width 2048
+
+Each image is trimmed to its visible pixels and packed on shelves,
+tallest first, with transparent padding between them; the index keeps
+the original size and where the trimmed part sat in it. Most of each cat
+image is empty margin, so the trimmed atlas has about a third of the
+pixels, and decodes in about the time the separate files took together.
+Visible pixels are copied unchanged, and the game keeps sprites trimmed,
+as subsurfaces of the atlas (see SpriteCache.load_image).
+"""
+import argparse
+import json
+import os
+import sys
+
+import pygame
+
+from sprite_cache import sprite_cache, file_hash, ATLAS_IMAGE, ATLAS_INDEX
+
+DEFAULT_MAX_WIDTH = 1024
+PADDING = 1  # Transparent gap between images, so neighbours never touch
+
+def pack(sizes, max_width, padding=PADDING):
+    """Place rectangles on shelves, tallest first.
+
+    Returns the top-left corner of each rectangle, in the order given,
+    and the size of the atlas holding them all.
+    """
+    positions = [None] * len(sizes)
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    x = y = shelf_height = width = 0
+    for i in order:
+        w, h = sizes[i]
+        # Start a new shelf when this image doesn't fit on the current one
+        if x and x + w > max_width:
+            y += shelf_height + padding
+            x = shelf_height = 0
+        positions[i] = (x, y)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+        width = max(width, x - padding)
+    return positions, (width, y + shelf_height)
+
+def build_atlas(images_dir, max_width=DEFAULT_MAX_WIDTH):
+    """Pack the PNG images in images_dir, returning the atlas surface and its index"""
+    names = sorted(name for name in os.listdir(images_dir) if name.lower().endswith('.png'))
+    # Convert like the game does, which also turns colorkeyed pixels transparent
+    images = [pygame.image.load(os.path.join(images_dir, name)).convert_alpha() for name in names]
+
+    # Only the visible part of each image goes into the atlas
+    bounds = [image.get_bounding_rect() for image in images]
+    max_width = max([max_width] + [rect.width for rect in bounds])
+    positions, size = pack([rect.size for rect in bounds], max_width)
+
+    atlas = pygame.Surface(size, pygame.SRCALPHA)
+    atlas.fill((0, 0, 0, 0))
+    sprites = {}
+    for name, image, rect, position in zip(names, images, bounds, positions):
+        # Take the larger of each channel over the cleared atlas, which copies the
+        # image exactly; a normal alpha blit would blend translucent edges with black
+        atlas.blit(image, position, rect, special_flags=pygame.BLEND_RGBA_MAX)
+        path = os.path.join(images_dir, name)
+        stat = os.stat(path)
+        sprites[name] = {
+            'rect': [position[0], position[1], rect.width, rect.height],
+            'offset': [rect.x, rect.y],  # Where the trimmed part sits in the original image
+            'size': [image.get_width(), image.get_height()],
+            # To spot images changed since packing, see image_changed()
+            'bytes': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_hash(path),
+        }
+    index = {
+        'image': ATLAS_IMAGE,
+        'size': list(size),
+        'sprites': sprites,
+    }
+    return atlas, index
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Pack assets/images into a texture atlas.")
+    parser.add_argument('--max-width', type=int, default=DEFAULT_MAX_WIDTH,
+                        help="widest the atlas may get before starting a new shelf")
+    args = parser.parse_args(argv)
+
+    # Converting images needs a display, a hidden one will do
+    pygame.display.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    atlas, index = build_atlas(sprite_cache.images_dir, args.max_width)
+    pygame.image.save(atlas, os.path.join(sprite_cache.assets_dir, ATLAS_IMAGE))
+    with open(os.path.join(sprite_cache.assets_dir, ATLAS_INDEX), 'w') as f:
+        json.dump(index, f, indent=2)
+
+    used = sum(entry['rect'][2] * entry['rect'][3] for entry in index['sprites'].values())
+    width, height = index['size']
+    print(f"Packed {len(index['sprites'])} images into {width}x{height} "
+          f"({used / (width * height):.0%} used): {ATLAS_IMAGE}, {ATLAS_INDEX}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
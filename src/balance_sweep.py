@@ -0,0 +1,211 @@
+"""Monte Carlo balance sweep over difficulty multipliers.
+
+Plays many headless games in parallel (see headless.py), one process per
+core, over a grid of difficulty multipliers and a range of seeds. Every
+finished run is written out as a JSON line as soon as it arrives, and only
+per-profile survival counters are kept in memory. Run from the src
+directory:
+
+    python balance_sweep.py --difficulty hard --runs 50 \\
+        --enemy-speed 1.0,1.2,1.4 --powerup-chance 0.05,0.1 --out sweep.jsonl
+
+Every profile plays the same seeds, so differences between profiles come
+from the multipliers rather than from luck of the draw.
+"""
+import argparse
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import headless
+from rng import seed_argument, MAX_SEED
+from settings import game_settings
+
+# Command line option -> difficulty setting it sweeps
+SWEEP_OPTIONS = {
+    'enemy_speed': 'enemy_speed_multiplier',
+    'enemy_spawn': 'enemy_spawn_multiplier',
+    'enemy_health': 'enemy_health_multiplier',
+    'powerup_chance': 'powerup_chance',
+}
+
+# Swept settings the game itself never applies, passed to headless.simulate
+# as enemy stat multipliers instead of overriding the difficulty profile
+ENEMY_OVERRIDES = {
+    'enemy_speed_multiplier': 'enemy_speed',
+    'enemy_health_multiplier': 'enemy_health',
+}
+
+DEFAULT_MAX_WAVES = 30  # Runs still going after this wave count as survivors
+
+def _init_worker():
+    """Silence asset-loading output in worker processes"""
+    sys.stdout = open(os.devnull, 'w')
+
+def run_job(job):
+    """Play one headless game with a difficulty profile (runs in a worker)"""
+    difficulty = job['difficulty']
+    settings = game_settings.difficulty_settings[difficulty]
+    saved = dict(settings)
+    enemy = {}
+    for setting, value in job['overrides'].items():
+        if setting in ENEMY_OVERRIDES:
+            enemy[ENEMY_OVERRIDES[setting]] = value
+        else:
+            settings[setting] = value
+    try:
+        result = headless.simulate(job['max_waves'], difficulty, job['seed'], job['max_ticks'], **enemy)
+    finally:
+        settings.clear()
+        settings.update(saved)
+
+    result['profile'] = job['profile']
+    result['overrides'] = job['overrides']
+    return result
+
+class ProfileStats:
+    """Survival distribution for one point of the sweep grid"""
+    def __init__(self, overrides):
+        self.overrides = overrides
+        self.waves = Counter()  # Wave reached -> number of runs
+        self.survivors = 0
+        self.runs = 0
+
+    def add(self, result):
+        self.runs += 1
+        if result['game_over']:
+            self.waves[result['wave']] += 1
+        else:
+            self.survivors += 1
+
+    def summary(self):
+        """Quantiles of the wave each run died on, survivors counted as the cap"""
+        waves = sorted(self.waves.elements())
+        waves += [None] * self.survivors
+        if not waves:
+            return {}
+
+        def quantile(q):
+            wave = waves[min(len(waves) - 1, int(q * len(waves)))]
+            return wave if wave is not None else 'survived'
+
+        deaths = [wave for wave in waves if wave is not None]
+        return {
+            'runs': self.runs,
+            'survival_rate': self.survivors / self.runs,
+            'mean_death_wave': statistics.fmean(deaths) if deaths else None,
+            'p10': quantile(0.1),
+            'median': quantile(0.5),
+            'p90': quantile(0.9),
+            'histogram': dict(sorted(self.waves.items())),
+        }
+
+def build_profiles(args):
+    """Return the sweep grid as a list of override dicts"""
+    axes = []
+    for option, setting in SWEEP_OPTIONS.items():
+        values = getattr(args, option)
+        if values:
+            axes.append([(setting, value) for value in values])
+    return [dict(point) for point in itertools.product(*axes)]
+
+def iter_jobs(profiles, args):
+    """Yield every (profile, seed) job, seed-major so early results cover every profile"""
+    for run in range(args.runs):
+        for index, overrides in enumerate(profiles):
+            yield {
+                'profile': index,
+                'overrides': overrides,
+                'difficulty': headless.DIFFICULTIES[args.difficulty],
+                'seed': args.seed + run,
+                'max_waves': args.max_waves,
+                'max_ticks': args.max_ticks,
+            }
+
+def sweep(profiles, args, out):
+    """Run every job across a process pool, streaming results to `out`.
+
+    At most a couple of jobs per worker are in flight at a time, so neither
+    the job list nor the results pile up in memory.
+    """
+    stats = [ProfileStats(overrides) for overrides in profiles]
+    jobs = iter_jobs(profiles, args)
+    total = len(profiles) * args.runs
+    done = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as executor:
+        pending = set()
+        for job in itertools.islice(jobs, args.workers * 2):
+            pending.add(executor.submit(run_job, job))
+
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                result = future.result()
+                stats[result['profile']].add(result)
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                done += 1
+
+                # Keep the pool topped up
+                for job in itertools.islice(jobs, 1):
+                    pending.add(executor.submit(run_job, job))
+
+            if not args.quiet:
+                elapsed = time.perf_counter() - start
+                print(f"\r{done}/{total} runs in {elapsed:.0f} s", end="", file=sys.stderr)
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    return stats
+
+def parse_values(text):
+    return [float(value) for value in text.split(',')]
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep Catpocalypse difficulty multipliers with headless games.")
+    parser.add_argument('--difficulty', choices=sorted(headless.DIFFICULTIES), default='normal',
+                        help="profile whose settings the sweep overrides")
+    parser.add_argument('--runs', type=int, default=20, help="games per profile")
+    parser.add_argument('--seed', type=seed_argument, default=0, help="seed of the first run, later runs count up")
+    for option, setting in SWEEP_OPTIONS.items():
+        parser.add_argument('--' + option.replace('_', '-'), type=parse_values, metavar='V1,V2,...',
+                            help=f"values to try for {setting}")
+    parser.add_argument('--max-waves', type=int, default=DEFAULT_MAX_WAVES,
+                        help="stop a run once this wave has been cleared")
+    parser.add_argument('--max-ticks', type=int, default=headless.DEFAULT_MAX_TICKS)
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument('--out', metavar='FILE', help="write each run as a JSON line to FILE (default: stdout)")
+    parser.add_argument('--quiet', action='store_true', help="no progress or summary on stderr")
+    args = parser.parse_args(argv)
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+    if args.seed + args.runs - 1 > MAX_SEED:
+        parser.error(f"--seed plus --runs must stay within {MAX_SEED}")
+
+    profiles = build_profiles(args)
+    out = open(args.out, 'w') if args.out else sys.stdout
+    try:
+        stats = sweep(profiles, args, out)
+    finally:
+        if args.out:
+            out.close()
+
+    if not args.quiet:
+        for profile in stats:
+            summary = profile.summary()
+            label = ", ".join(f"{name}={value:g}" for name, value in profile.overrides.items()) or "defaults"
+            print(f"{label}: {summary['survival_rate']:.0%} survived, death wave "
+                  f"p10 {summary['p10']} / median {summary['median']} / p90 {summary['p90']}",
+                  file=sys.stderr)
+            print(f"  histogram {summary['histogram']}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,330 @@
+"""Reproducible stress scenarios for the update and draw hot paths.
+
+Each scenario builds a headless game in a fixed state, keeps the load
+topped up while it runs, and times Game.update and Game.draw separately
+for every frame. Peak Python heap use is measured with tracemalloc in a
+second, untimed pass, since tracing slows everything down. Run from the
+src directory:
+
+    python benchmark.py                  # run and compare with the baseline
+    python benchmark.py --save-baseline  # record a new baseline
+    python benchmark.py --scenario bullets --frames 300 --json
+    python benchmark.py --pipelined      # also time the pipelined loop
+
+The baseline is machine specific, so record it on the machine you compare
+on. Any mean or 95th percentile frame time, or peak memory, that grows by
+more than --threshold over the baseline is reported as a regression and
+makes the exit status non-zero, as does a scenario with no baseline entry,
+an image read from disk mid-run or a wall layer built more than once.
+
+With --pipelined, each scenario is also run with the simulation on a
+worker thread while the previous frame draws (see pipeline.py), and whole
+frame times are compared with the serial update-then-draw loop.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import headless
+from animation import animation_manager
+from particles import particle_system, FUR, SPARK, DEBRIS
+from pipeline import SimulationThread
+from enemy import ENEMY_NORMAL, ENEMY_FAST, ENEMY_TANK
+from settings import DIFFICULTY_NORMAL, DIFFICULTY_HARD
+from sprite_cache import sprite_cache
+from text_cache import text_cache
+
+DEFAULT_FRAMES = 600
+WARMUP_FRAMES = 30
+DEFAULT_THRESHOLD = 0.2  # Flag anything more than 20% worse than the baseline
+
+# Smaller absolute changes are timer and allocator noise, whatever the ratio
+NOISE_FLOOR = {'ms': 0.1, 'KB': 64}
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+SEED = 1234
+
+# Health for walls and enemies that must not fall during a run
+UNBREAKABLE = 10 ** 9
+
+# Wall health in wall_pile: every enemy hitting at once takes a quarter of it
+WALL_PILE_HEALTH = 20000
+
+class Scenario:
+    """A named game setup plus a hook that keeps its load constant each frame"""
+    def __init__(self, name, description, setup, refill=None, difficulty=DIFFICULTY_NORMAL, bot=True):
+        self.name = name
+        self.description = description
+        self.setup = setup
+        self.refill = refill
+        self.difficulty = difficulty
+        self.bot = bot
+
+def hold_wave(game):
+    """Keep the wall standing and stop new waves from starting"""
+    game.wall.health = game.wall.max_health = UNBREAKABLE
+    game.wave = 1
+    game.wave_timer = UNBREAKABLE
+
+def setup_wave_30(game):
+    game.wall.health = game.wall.max_health = UNBREAKABLE
+    game.wave = 29
+    game.spawn_wave()
+
+def setup_wall_pile(game):
+    hold_wave(game)
+    wall = game.wall
+    types = (ENEMY_NORMAL, ENEMY_FAST, ENEMY_TANK)
+    for i, y in enumerate(np.linspace(50, game.wall.height - 50, 1000)):
+        enemy = game.enemies.spawn(0, float(y), types[i % 3])
+        enemy.x = enemy.prev_x = wall.x - enemy.width // 2 - wall.width // 2
+        enemy.at_wall = True
+        enemy.health = enemy.max_health = UNBREAKABLE
+    wall.health = wall.max_health = WALL_PILE_HEALTH
+
+def refill_wall(game):
+    """Repair the wall before the next volley would break it, so its health keeps cycling"""
+    wall = game.wall
+    if wall.health <= wall.max_health // 4:
+        wall.health = wall.max_health
+
+def refill_bullets(game):
+    # Fan bullets out from the left edge so they cross the whole screen
+    bullets = game.bullets
+    while len(bullets) < 500:
+        angle = (len(bullets.items) * 7) % 60 - 30
+        bullets.spawn(10, game.wall.height / 2, angle)
+
+def refill_text(game):
+    animations = animation_manager.animations
+    while len(animations) < 200:
+        index = len(animations.items)
+        animation_manager.add_text(50 + (index * 37) % 700, 100 + (index * 53) % 400,
+                                   f"+{index * 25}", (255, 255, 0), 24 + index % 3 * 8, 120)
+
+def refill_effects(game):
+    # A mass kill: explosions, hits and power-up pickups all over the field
+    animations = animation_manager.animations
+    effects = (animation_manager.add_explosion, animation_manager.add_hit, animation_manager.add_powerup)
+    while len(animations) < 150:
+        index = len(animations.items)
+        effects[index % 3](50 + (index * 37) % 700, 100 + (index * 53) % 400)
+
+def refill_particles(game):
+    # Bursts all over the field, enough to keep about 10000 particles alive
+    index = 0
+    while len(particle_system) < 10000:
+        kind = (FUR, SPARK, DEBRIS)[index % 3]
+        particle_system.burst(50 + (index * 37) % 700, 100 + (index * 53) % 400, kind, 50)
+        particle_system.emit_pending()
+        index += 1
+
+SCENARIOS = [
+    Scenario('wave30_hard', "wave 30 on Hard, played by the aim bot",
+             setup_wave_30, difficulty=DIFFICULTY_HARD),
+    Scenario('wall_pile', "1000 enemies attacking the wall while the bot fires",
+             setup_wall_pile, refill_wall),
+    Scenario('bullets', "500 live bullets with trails",
+             hold_wave, refill_bullets, bot=False),
+    Scenario('floating_text', "200 concurrent floating text animations",
+             hold_wave, refill_text, bot=False),
+    Scenario('mass_kill', "150 concurrent explosion, hit and power-up animations",
+             hold_wave, refill_effects, bot=False),
+    Scenario('particles', "10000 live fur, spark and debris particles",
+             hold_wave, refill_particles, bot=False),
+]
+
+def start_scenario(scenario):
+    """Build the scenario's game and return it with its bot"""
+    game = headless.create_game(scenario.difficulty, SEED)
+    animation_manager.animations.clear()
+    particle_system.clear()
+    scenario.setup(game)
+    bot = headless.AimBot(game) if scenario.bot else None
+    return game, bot
+
+def step(scenario, game, bot):
+    if scenario.refill:
+        scenario.refill(game)
+    if bot:
+        bot.act()
+
+def summarize(samples):
+    """Frame time statistics in milliseconds"""
+    ms = np.asarray(samples) / 1e6
+    return {
+        'mean': float(ms.mean()),
+        'p50': float(np.percentile(ms, 50)),
+        'p95': float(np.percentile(ms, 95)),
+        'max': float(ms.max()),
+    }
+
+def run_scenario(scenario, frames):
+    """Time update and draw separately, then measure peak memory"""
+    game, bot = start_scenario(scenario)
+    for _ in range(WARMUP_FRAMES):
+        step(scenario, game, bot)
+        game.update()
+        game.draw()
+
+    update_ns = np.zeros(frames, dtype=np.int64)
+    draw_ns = np.zeros(frames, dtype=np.int64)
+    clock = time.perf_counter_ns
+    disk_reads = sprite_cache.disk_reads
+    for i in range(frames):
+        step(scenario, game, bot)
+        start = clock()
+        game.update()
+        middle = clock()
+        game.draw()
+        update_ns[i] = middle - start
+        draw_ns[i] = clock() - middle
+    disk_reads = sprite_cache.disk_reads - disk_reads
+
+    # Same run again under tracemalloc, from setup onwards
+    tracemalloc.start()
+    game, bot = start_scenario(scenario)
+    for _ in range(WARMUP_FRAMES + frames):
+        step(scenario, game, bot)
+        game.update()
+        game.draw()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'description': scenario.description,
+        'frames': frames,
+        'enemies': len(game.enemies),
+        'bullets': len(game.bullets),
+        'animations': len(animation_manager.animations),
+        'particles': len(particle_system),
+        'update_ms': summarize(update_ns),
+        'draw_ms': summarize(draw_ns),
+        'frame_ms': summarize(update_ns + draw_ns),
+        'peak_kb': peak / 1024,
+        'disk_reads': disk_reads,  # Image files read while measuring, should be 0
+        'wall_layers': game.wall.layers.stats(),
+        'text_cache': text_cache.stats(),
+    }
+
+def run_pipelined(scenario, frames):
+    """Time whole frames with each tick on the simulation thread, overlapping the previous frame's draw"""
+    game, bot = start_scenario(scenario)
+    pipeline = SimulationThread(game)
+    draw = lambda snapshot: game.draw(snapshot.alpha, snapshot)
+    for _ in range(WARMUP_FRAMES):
+        step(scenario, game, bot)
+        pipeline.step(1, 1.0, draw)
+        
+    frame_ns = np.zeros(frames, dtype=np.int64)
+    clock = time.perf_counter_ns
+    for i in range(frames):
+        step(scenario, game, bot)
+        start = clock()
+        pipeline.step(1, 1.0, draw)
+        frame_ns[i] = clock() - start
+    pipeline.stop()
+    return summarize(frame_ns), game.wall.layers.stats()
+
+def compare(results, baseline, threshold):
+    """Return a line for every metric that regressed beyond the threshold.
+
+    A scenario missing from the baseline is reported too, since nothing
+    about it can be checked until a baseline is recorded.
+    """
+    regressions = []
+    for name, result in results.items():
+        if result['disk_reads']:
+            regressions.append(f"{name}: {result['disk_reads']} image files read from disk mid-run")
+        # Each wall layer is built once per game, more builds than layers means one was thrown away
+        for key, mode in (('wall_layers', "serial"), ('pipelined_wall_layers', "pipelined")):
+            layers = result.get(key)
+            if layers and layers['builds'] > layers['layers']:
+                regressions.append(f"{name}: wall layer rebuilt {layers['builds'] - layers['layers']} times "
+                                   f"in {mode} frames")
+
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            regressions.append(f"{name}: no baseline entry, record one with --save-baseline")
+            continue
+        metrics = [(f"{phase} {stat}", result[phase][stat], base[phase][stat], "ms")
+                   for phase in ('update_ms', 'draw_ms') for stat in ('mean', 'p95')]
+        metrics.append(("peak memory", result['peak_kb'], base['peak_kb'], "KB"))
+        for label, current, previous, unit in metrics:
+            if current > previous * (1 + threshold) and current - previous > NOISE_FLOOR[unit]:
+                growth = f" (+{current / previous - 1:.0%})" if previous > 0 else ""
+                regressions.append(f"{name}: {label} {previous:.2f} -> {current:.2f} {unit}{growth}")
+    return regressions
+
+def main_cli(argv=None):
+    names = [scenario.name for scenario in SCENARIOS]
+    parser = argparse.ArgumentParser(description="Benchmark Catpocalypse update and draw under stress scenarios.")
+    parser.add_argument('--scenario', action='append', choices=names,
+                        help="scenario to run, may be repeated (default: all)")
+    parser.add_argument('--frames', type=int, default=DEFAULT_FRAMES, help="measured frames per scenario")
+    parser.add_argument('--baseline', metavar='FILE', default=DEFAULT_BASELINE,
+                        help="baseline results to compare with")
+    parser.add_argument('--save-baseline', action='store_true', help="write the results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown that counts as a regression")
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    parser.add_argument('--pipelined', action='store_true',
+                        help="also time frames with the simulation on its own thread")
+    args = parser.parse_args(argv)
+
+    selected = [scenario for scenario in SCENARIOS if not args.scenario or scenario.name in args.scenario]
+    results = {}
+    for scenario in selected:
+        # Keep asset-loading chatter out of the report
+        with contextlib.redirect_stdout(open(os.devnull, 'w')):
+            results[scenario.name] = run_scenario(scenario, args.frames)
+            if args.pipelined:
+                frame_ms, wall_layers = run_pipelined(scenario, args.frames)
+                results[scenario.name]['pipelined_frame_ms'] = frame_ms
+                results[scenario.name]['pipelined_wall_layers'] = wall_layers
+
+        if not args.json:
+            result = results[scenario.name]
+            update, draw = result['update_ms'], result['draw_ms']
+            print(f"{scenario.name:14} update {update['mean']:6.2f} ms (p95 {update['p95']:6.2f})  "
+                  f"draw {draw['mean']:6.2f} ms (p95 {draw['p95']:6.2f})  "
+                  f"peak {result['peak_kb']:8.0f} KB")
+            if args.pipelined:
+                serial, pipelined = result['frame_ms']['mean'], result['pipelined_frame_ms']['mean']
+                print(f"{'':14} frame  {serial:6.2f} ms serial, {pipelined:6.2f} ms pipelined "
+                      f"({serial / pipelined:.2f}x throughput)")
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scenarios': results,
+    }
+
+    regressions = []
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+    report['regressions'] = regressions
+
+    if args.json:
+        print(json.dumps(report))
+    elif args.save_baseline:
+        print(f"Saved baseline to {args.baseline}")
+    else:
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if not regressions and os.path.exists(args.baseline):
+            print(f"No regressions beyond {args.threshold:.0%} of {args.baseline}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,111 @@
+"""Benchmark the spatial-grid collision broad-phase against the brute-force scan.
+
+Run from the src directory:
+
+    python collision_benchmark.py
+
+For each entity count, bullets and enemies are scattered over the playfield
+and every bullet is tested for its first overlapping enemy, once with the
+old nested loop and once through SpatialGrid. The "wall" layout piles every
+enemy into the strip in front of the wall, which is the worst case for a
+uniform grid.
+"""
+import random
+import time
+
+from spatial_grid import SpatialGrid
+from bullet import BULLET_RADIUS
+
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+WALL_X = SCREEN_WIDTH * 2 // 3
+
+# Enemy hitbox sizes for ENEMY_NORMAL, ENEMY_FAST and ENEMY_TANK
+ENEMY_SIZES = [(30, 50), (25, 40), (40, 60)]
+
+COUNTS = [100, 250, 500, 1000, 2000, 4000]
+BRUTE_FORCE_LIMIT = 2000  # The nested loop is too slow to run past this
+REPEATS = 3
+
+def make_entities(count, layout, rng):
+    """Build (x, y, half_width, half_height) enemies and (x, y) bullets"""
+    enemies = []
+    for _ in range(count):
+        width, height = rng.choice(ENEMY_SIZES)
+        if layout == "wall":
+            x = WALL_X - width // 2 - 10
+        else:
+            x = rng.uniform(0, WALL_X)
+        y = rng.uniform(50, SCREEN_HEIGHT - 50)
+        enemies.append((x, y, width // 2, height // 2))
+
+    bullets = [(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT)) for _ in range(count)]
+    return enemies, bullets
+
+def brute_force(enemies, bullets):
+    """The original O(B x E) scan"""
+    hits = []
+    for bx, by in bullets:
+        hit = -1
+        for index, (ex, ey, hw, hh) in enumerate(enemies):
+            if abs(bx - ex) < hw + BULLET_RADIUS and abs(by - ey) < hh + BULLET_RADIUS:
+                hit = index
+                break
+        hits.append(hit)
+    return hits
+
+def grid_scan(grid, enemies, bullets):
+    """Rebuild the grid and test each bullet against its own cell"""
+    grid.clear()
+    for index, (ex, ey, hw, hh) in enumerate(enemies):
+        grid.insert(index, ex, ey, hw + BULLET_RADIUS, hh + BULLET_RADIUS)
+
+    hits = []
+    for bx, by in bullets:
+        hit = -1
+        for index in grid.query_point(bx, by):
+            ex, ey, hw, hh = enemies[index]
+            if abs(bx - ex) < hw + BULLET_RADIUS and abs(by - ey) < hh + BULLET_RADIUS:
+                hit = index
+                break
+        hits.append(hit)
+    return hits
+
+def best_time(func, *args):
+    """Return the fastest of several runs in milliseconds, plus the result"""
+    best = None
+    result = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = (time.perf_counter() - start) * 1000
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+def run(layout):
+    rng = random.Random(1234)
+    grid = SpatialGrid(SCREEN_WIDTH, SCREEN_HEIGHT)
+
+    print(f"\nLayout: {layout} ({grid.cols}x{grid.rows} cells of {grid.cell_size}px)")
+    print(f"{'entities':>9} {'brute ms':>10} {'grid ms':>9} {'grid us/entity':>15} {'speedup':>8}")
+
+    for count in COUNTS:
+        enemies, bullets = make_entities(count, layout, rng)
+        grid_ms, grid_hits = best_time(grid_scan, grid, enemies, bullets)
+
+        if count <= BRUTE_FORCE_LIMIT:
+            brute_ms, brute_hits = best_time(brute_force, enemies, bullets)
+            assert brute_hits == grid_hits, "grid and brute force disagree"
+            brute_text = f"{brute_ms:10.2f}"
+            speedup_text = f"{brute_ms / grid_ms:7.1f}x"
+        else:
+            brute_text = f"{'-':>10}"
+            speedup_text = f"{'-':>8}"
+
+        per_entity = grid_ms * 1000 / (2 * count)
+        print(f"{count:>9} {brute_text} {grid_ms:9.2f} {per_entity:15.2f} {speedup_text}")
+
+if __name__ == "__main__":
+    run("spread")
+    run("wall")
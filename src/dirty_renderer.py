@@ -0,0 +1,129 @@
+import pygame
+
+# Above this share of the screen changing, one full flip is cheaper than many small updates
+DEFAULT_MAX_DIRTY_FRACTION = 0.5
+
+# Merging overlapping rects is quadratic, beyond this many a full flip is the safe bet
+MAX_MERGE_RECTS = 256
+
+class DirtyRectRenderer:
+    """Presents only the parts of the screen that changed since the last frame.
+
+    Every frame, the areas drawn over last frame are painted back from the
+    static background, the frame's entities are drawn on top, and the
+    display is updated with the old and new areas together:
+
+        renderer.restore(screen, background)
+        rects = [entity.draw(screen) for entity in entities]
+        renderer.present(rects)
+
+    Screens that don't move (menus, pause) are drawn once and then skipped
+    until invalidate() is called. When too much of the screen is dirty the
+    renderer falls back to a full flip.
+    """
+    def __init__(self, size, max_dirty_fraction=DEFAULT_MAX_DIRTY_FRACTION):
+        self.screen_rect = pygame.Rect((0, 0), size)
+        self.max_dirty_area = self.screen_rect.width * self.screen_rect.height * max_dirty_fraction
+        self.previous_rects = []  # Areas drawn over last frame, to be restored
+        self.background = None  # Layer the previous frame was restored from
+        self.background_rects = []  # Background areas repainted this frame
+        self.full_redraw = True  # Next frame repaints and flips the whole screen
+        self.state = None  # Game state the screen was last drawn for
+
+        # Counters, see stats()
+        self.full_frames = 0
+        self.partial_frames = 0
+        self.skipped_frames = 0
+
+    def invalidate(self):
+        """Redraw the whole screen next frame, after anything the renderer can't see changes it"""
+        self.full_redraw = True
+
+    def set_state(self, state):
+        """Start over whenever the game switches screens"""
+        if state != self.state:
+            self.state = state
+            self.invalidate()
+
+    def restore(self, screen, background, changed_rect=None):
+        """Paint the background back over last frame's areas.
+
+        changed_rect is the only part of the background that can differ
+        when a different background surface is passed in (the wall, when
+        it flashes); without it, a new background repaints everything.
+        """
+        self.background_rects = []
+        if background is not self.background:
+            self.background = background
+            if changed_rect is None:
+                self.invalidate()
+            else:
+                self.background_rects.append(screen.blit(background, changed_rect.topleft, changed_rect))
+
+        if self.full_redraw:
+            screen.blit(background, (0, 0))
+            return
+
+        for rect in self.previous_rects:
+            screen.blit(background, rect.topleft, rect)
+
+    def present(self, rects):
+        """Update the display with last frame's areas and this frame's, or flip it all"""
+        # Drop nothing-drawn entries and clip to the screen, so areas are what's really on it
+        clip = self.screen_rect.clip
+        current = [rect for rect in map(clip, filter(None, rects)) if rect.width and rect.height]
+
+        dirty = self.previous_rects + self.background_rects + current
+        self.previous_rects = current
+        if not self.full_redraw and area(dirty) > self.max_dirty_area and len(dirty) <= MAX_MERGE_RECTS:
+            # An entity's old and new areas mostly overlap, don't count (or copy) them twice
+            dirty = merge(dirty)
+
+        if self.full_redraw or area(dirty) > self.max_dirty_area:
+            self.flip()
+        else:
+            pygame.display.update(dirty)
+            self.partial_frames += 1
+
+    def flip(self):
+        """Present the whole screen"""
+        pygame.display.flip()
+        self.full_redraw = False
+        self.full_frames += 1
+
+    def skip(self):
+        """Leave the display as it is, nothing changed"""
+        self.skipped_frames += 1
+
+    def stats(self):
+        """Return the frame counters"""
+        return {
+            'full': self.full_frames,
+            'partial': self.partial_frames,
+            'skipped': self.skipped_frames,
+        }
+
+def area(rects):
+    return sum(rect.width * rect.height for rect in rects)
+
+def merge(rects):
+    """Replace overlapping rects by their union, wherever it is no bigger than both.
+
+    An enemy brushing the full-width HUD bar stays a separate rect rather
+    than growing the bar into a box that covers half the screen.
+    """
+    merged = []
+    for rect in rects:
+        merging = True
+        while merging:
+            merging = False
+            for index in rect.collidelistall(merged):
+                other = merged[index]
+                union = rect.union(other)
+                if area((union,)) <= area((rect, other)):
+                    del merged[index]
+                    rect = union
+                    merging = True
+                    break
+        merged.append(rect)
+    return merged
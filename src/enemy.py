@@ -1,9 +1,14 @@
 import pygame
 import math
-import random
-import os
+import copy
+import numpy as np
 from sound_manager import sound_manager
 from animation import animation_manager
+from particles import particle_system, FUR, SPARK, DEBRIS
+from pool import ArrayPool
+from rng import rng
+from sprite_cache import sprite_cache, SpriteSheet, tint, flash, scale_frame
+from quality import quality_governor
 
 # Colors
 RED = (255, 0, 0)
@@ -11,60 +16,95 @@ GREEN = (0, 255, 0)
 ORANGE = (255, 165, 0)
 PURPLE = (128, 0, 128)
 BLACK = (0, 0, 0)  # Added BLACK color definition
+WHITE = (255, 255, 255)
 
 # Enemy types
 ENEMY_NORMAL = 0
 ENEMY_FAST = 1
 ENEMY_TANK = 2
 
+# Per-type attributes
+ENEMY_STATS = {
+    # Normal enemy - medium speed, medium health (3 hits)
+    ENEMY_NORMAL: {'width': 30, 'height': 50, 'speed': 1.0, 'health': 75,
+                   'color': RED, 'damage': 5, 'scale_factor': 1.0},
+    # Fast enemy - high speed, low health (2 hits)
+    ENEMY_FAST: {'width': 25, 'height': 40, 'speed': 1.8, 'health': 50,
+                 'color': ORANGE, 'damage': 5, 'scale_factor': 0.8},
+    # Tank enemy - low speed, high health (5 hits)
+    ENEMY_TANK: {'width': 40, 'height': 60, 'speed': 0.6, 'health': 125,
+                 'color': PURPLE, 'damage': 5, 'scale_factor': 1.2},
+}
+
+# Sprite shared by every enemy type, tinted with the type's color
+ENEMY_SPRITE = "New Piskel (7).png"
+HIT_FLASH_ALPHA = 150  # Strength of the white hit flash
+
+# Health bar drawn above each enemy
+HEALTH_BAR_HEIGHT = 3
+HEALTH_BAR_OFFSET = 10  # Pixels between the top of the bar and the sprite
+
+ATTACK_COOLDOWN_MAX = 60  # 1 second at 60 FPS
+
+# Particles emitted per hit, per death and per attack on the wall
+HIT_PARTICLES = 6
+DEATH_PARTICLES = 24
+WALL_SPARKS = 5
+WALL_DEBRIS = 3
+
+def _pool_field(name):
+    """Property that reads and writes this enemy's row of an EnemyPool array"""
+    def getter(self):
+        return getattr(self.pool, name).item(self.pool_index)
+    
+    def setter(self, value):
+        getattr(self.pool, name)[self.pool_index] = value
+        
+    return property(getter, setter)
+
 class Enemy:
-    def __init__(self, x, y, enemy_type=ENEMY_NORMAL):
-        self.x = x
-        self.y = y
+    """Handle onto one row of an EnemyPool.
+
+    Per-frame state (position, health, cooldowns, wobble) lives in the pool's
+    arrays and is updated in bulk by EnemyPool.update; the handle keeps the
+    fixed per-type attributes and the sprite, and exposes the pool row as
+    ordinary attributes for collision, damage and drawing code.
+    """
+    x = _pool_field('x')
+    y = _pool_field('y')
+    prev_x = _pool_field('prev_x')
+    prev_y = _pool_field('prev_y')
+    speed = _pool_field('speed')
+    health = _pool_field('health')
+    max_health = _pool_field('max_health')
+    attack_cooldown = _pool_field('attack_cooldown')
+    hit_flash = _pool_field('hit_flash')
+    wobble = _pool_field('wobble')
+    at_wall = _pool_field('at_wall')
+    
+    def __init__(self, pool, enemy_type=ENEMY_NORMAL):
+        self.pool_index = 0
+        self.alive = True
+        self.enemy_type = None
+        self.sprite = None
+        self.flash_sprite = None
+        self.reset(pool, enemy_type)
+        
+    def reset(self, pool, enemy_type=ENEMY_NORMAL):
+        """Point this handle at a freshly spawned enemy"""
+        self.pool = pool
+        if enemy_type == self.enemy_type and self.sprite:
+            return  # Recycled handle of the same type, sprite is still valid
         self.enemy_type = enemy_type
-        self.at_wall = False  # Flag to track if enemy has reached the wall
-        self.hit_flash = 0  # Flash effect when hit
         
         # Set attributes based on enemy type
-        if enemy_type == ENEMY_NORMAL:
-            # Normal enemy - medium speed, medium health (3 hits)
-            self.width = 30
-            self.height = 50
-            self.speed = 1.0
-            self.health = 75
-            self.max_health = 75
-            self.color = RED
-            self.damage = 5
-            self.scale_factor = 1.0  # Normal size
-        elif enemy_type == ENEMY_FAST:
-            # Fast enemy - high speed, low health (2 hits)
-            self.width = 25
-            self.height = 40
-            self.speed = 1.8
-            self.health = 50
-            self.max_health = 50
-            self.color = ORANGE
-            self.damage = 5
-            self.scale_factor = 0.8  # Smaller size
-        else:  # ENEMY_TANK
-            # Tank enemy - low speed, high health (5 hits)
-            self.width = 40
-            self.height = 60
-            self.speed = 0.6
-            self.health = 125
-            self.max_health = 125
-            self.color = PURPLE
-            self.damage = 5
-            self.scale_factor = 1.2  # Larger size
-            
-        self.attack_cooldown = 0
-        self.attack_cooldown_max = 60  # 1 second at 60 FPS
-        
-        # Animation properties
-        self.wobble = 0
-        self.wobble_dir = 1
-        self.wobble_speed = random.uniform(0.1, 0.2)
-        self.wobble_amount = random.uniform(1, 3)
+        stats = ENEMY_STATS[enemy_type]
+        self.width = stats['width']
+        self.height = stats['height']
+        self.color = stats['color']
+        self.damage = stats['damage']
+        self.scale_factor = stats['scale_factor']
+        self.attack_cooldown_max = ATTACK_COOLDOWN_MAX
         
         # Sprite properties
         self.sprite = None
@@ -76,95 +116,38 @@ class Enemy:
         self.load_sprite()
         
     def load_sprite(self):
-        """Load enemy sprite"""
-        try:
-            # Get the script directory
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            
-            # Get the assets directory path - one level up from script_dir, then into assets
-            assets_dir = os.path.join(os.path.dirname(script_dir), 'assets')
-            
-            # Base path
-            sprite_path = os.path.join(assets_dir, "images", "New Piskel (7).png")
-            
-            print(f"Loading enemy sprite from: {sprite_path}")
-            
-            # Load the sprite
-            self.sprite = pygame.image.load(sprite_path).convert_alpha()
-            
-            # Scale the sprite based on enemy type
-            scaled_width = int(self.sprite_width * self.scale_factor)
-            scaled_height = int(self.sprite_height * self.scale_factor)
-            self.sprite = pygame.transform.scale(self.sprite, (scaled_width, scaled_height))
-            
-            # Apply color tint based on enemy type
-            if self.enemy_type == ENEMY_NORMAL:
-                # Normal enemy - red tint
-                self.apply_color_tint(RED)
-            elif self.enemy_type == ENEMY_FAST:
-                # Fast enemy - orange tint
-                self.apply_color_tint(ORANGE)
-            else:  # ENEMY_TANK
-                # Tank enemy - purple tint
-                self.apply_color_tint(PURPLE)
-            
-            # Set sprite placeholder to False since we loaded the sprite
-            self.sprite_placeholder = False
-            
-            print(f"Enemy sprite loaded successfully for type {self.enemy_type}")
-        except Exception as e:
-            print(f"Error loading enemy sprite: {e}")
-            # If loading fails, use placeholder
-            self.sprite_placeholder = True
-            
-    def apply_color_tint(self, color):
-        """Apply a color tint to the sprite"""
-        if self.sprite:
-            # Create a copy of the sprite
-            tinted_sprite = self.sprite.copy()
-            
-            # Create a surface with the tint color
-            tint = pygame.Surface(tinted_sprite.get_size(), pygame.SRCALPHA)
-            tint.fill((color[0], color[1], color[2], 100))  # Semi-transparent color
-            
-            # Apply the tint
-            tinted_sprite.blit(tint, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-            
-            # Update the sprite
-            self.sprite = tinted_sprite
+        """Take this type's sprite from the shared cache, building it on first use"""
+        key = (ENEMY_SPRITE, self.enemy_type, self.scale_factor)
+        self.sprite = sprite_cache.get(key, self.build_sprite)
         
-    def update(self, target_x, target_y):
-        # Update attack cooldown
-        if self.attack_cooldown > 0:
-            self.attack_cooldown -= 1
-            
-        # Update hit flash effect
-        if self.hit_flash > 0:
-            self.hit_flash -= 1
-            
-        # Update wobble animation
-        self.wobble += self.wobble_speed * self.wobble_dir
-        if abs(self.wobble) > self.wobble_amount:
-            self.wobble_dir *= -1
-            
-        # Check if at wall
-        if abs(self.x - target_x) < 5:
-            self.at_wall = True
+        # Fall back to the drawn placeholder if the sprite couldn't be loaded
+        self.sprite_placeholder = self.sprite is None
+        if self.sprite_placeholder:
+            self.flash_sprite = None
             return
             
-        # Move towards target
-        dx = target_x - self.x
-        dy = target_y - self.y
-        dist = math.sqrt(dx * dx + dy * dy)
-        
-        if dist > 0:
-            dx = dx / dist
-            dy = dy / dist
-            
-            self.x += dx * self.speed
-            self.y += dy * self.speed
-            
-    def draw(self, screen):
+        # White hit flash variant, baked once so flashing is a plain blit
+        self.flash_sprite = sprite_cache.get(key + ('flash',),
+                                             lambda: flash(self.sprite, WHITE, HIT_FLASH_ALPHA))
+        
+    def build_sprite(self):
+        """Scale and tint the enemy image for this type"""
+        sprite, offset, size = sprite_cache.load_image(ENEMY_SPRITE)
+        
+        # Scale the sprite based on enemy type
+        scaled_width = int(self.sprite_width * self.scale_factor)
+        scaled_height = int(self.sprite_height * self.scale_factor)
+        sprite = scale_frame(sprite, offset, size, (scaled_width, scaled_height))
+        
+        # Apply color tint based on enemy type
+        return tint(sprite, self.color)
+        
+    def draw(self, screen, alpha=1.0):
+        """Draw the enemy and its health bar, returning the area drawn over"""
+        # Interpolate between the last two simulation ticks
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        
         # Apply wobble effect to y position
         wobble_offset = self.wobble
         
@@ -175,73 +158,69 @@ class Enemy:
             
         if not self.sprite_placeholder and self.sprite:
             # Calculate position to center the sprite on enemy coordinates
-            sprite_x = self.x - self.sprite.get_width() // 2
-            sprite_y = self.y - self.sprite.get_height() // 2 + wobble_offset
+            sprite_x = x - self.sprite.get_width() // 2
+            sprite_y = y - self.sprite.get_height() // 2 + wobble_offset
             
             # Apply flash effect if active
             if self.hit_flash > 0 and self.hit_flash % 2 == 0:
-                # Create a copy of the sprite and apply a white overlay
-                sprite_copy = self.sprite.copy()
-                overlay = pygame.Surface(sprite_copy.get_size(), pygame.SRCALPHA)
-                overlay.fill((255, 255, 255, 150))  # Semi-transparent white
-                sprite_copy.blit(overlay, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
-                screen.blit(sprite_copy, (sprite_x, sprite_y))
+                rect = screen.blit(self.flash_sprite, (sprite_x, sprite_y))
             else:
-                screen.blit(self.sprite, (sprite_x, sprite_y))
+                rect = screen.blit(self.sprite, (sprite_x, sprite_y))
                 
             # Draw health bar
             health_bar_width = self.sprite.get_width()
-            health_bar_height = 3
+            health_bar_height = HEALTH_BAR_HEIGHT
             health_ratio = self.health / self.max_health
             
-            pygame.draw.rect(screen, (255, 0, 0), 
+            rect.union_ip(pygame.draw.rect(screen, (255, 0, 0), 
                             (sprite_x, 
-                             sprite_y - 10, 
-                             health_bar_width, health_bar_height))
+                             sprite_y - HEALTH_BAR_OFFSET, 
+                             health_bar_width, health_bar_height)))
             pygame.draw.rect(screen, (0, 255, 0), 
                             (sprite_x, 
-                             sprite_y - 10, 
+                             sprite_y - HEALTH_BAR_OFFSET, 
                              health_bar_width * health_ratio, health_bar_height))
         else:
             # Draw placeholder (will be replaced with sprite later)
             # Draw basic cat shape
-            pygame.draw.ellipse(screen, color, (self.x - self.width//2, 
-                                             self.y - self.height//2 + wobble_offset, 
+            rect = pygame.draw.ellipse(screen, color, (x - self.width//2, 
+                                             y - self.height//2 + wobble_offset, 
                                              self.width, self.height))
             
             # Draw cat ears (simple triangle shapes)
             ear_height = 8
-            pygame.draw.polygon(screen, BLACK, [
-                (self.x - 8, self.y - self.height//2 + wobble_offset + 5),
-                (self.x - 12, self.y - self.height//2 + wobble_offset - ear_height),
-                (self.x - 4, self.y - self.height//2 + wobble_offset + 5)
-            ])
-            pygame.draw.polygon(screen, BLACK, [
-                (self.x + 8, self.y - self.height//2 + wobble_offset + 5),
-                (self.x + 12, self.y - self.height//2 + wobble_offset - ear_height),
-                (self.x + 4, self.y - self.height//2 + wobble_offset + 5)
-            ])
+            rect.union_ip(pygame.draw.polygon(screen, BLACK, [
+                (x - 8, y - self.height//2 + wobble_offset + 5),
+                (x - 12, y - self.height//2 + wobble_offset - ear_height),
+                (x - 4, y - self.height//2 + wobble_offset + 5)
+            ]))
+            rect.union_ip(pygame.draw.polygon(screen, BLACK, [
+                (x + 8, y - self.height//2 + wobble_offset + 5),
+                (x + 12, y - self.height//2 + wobble_offset - ear_height),
+                (x + 4, y - self.height//2 + wobble_offset + 5)
+            ]))
             
             # Draw eyes
             eye_color = (255, 255, 0)  # Yellow eyes
             pygame.draw.circle(screen, eye_color, 
-                              (int(self.x - 5), int(self.y - self.height//4 + wobble_offset)), 3)
+                              (int(x - 5), int(y - self.height//4 + wobble_offset)), 3)
             pygame.draw.circle(screen, eye_color, 
-                              (int(self.x + 5), int(self.y - self.height//4 + wobble_offset)), 3)
+                              (int(x + 5), int(y - self.height//4 + wobble_offset)), 3)
             
             # Draw health bar
             health_bar_width = self.width
             health_bar_height = 3
             health_ratio = self.health / self.max_health
             
-            pygame.draw.rect(screen, (255, 0, 0), 
-                            (self.x - health_bar_width//2, 
-                             self.y - self.height//2 - 10 + wobble_offset, 
-                             health_bar_width, health_bar_height))
+            rect.union_ip(pygame.draw.rect(screen, (255, 0, 0), 
+                            (x - health_bar_width//2, 
+                             y - self.height//2 - 10 + wobble_offset, 
+                             health_bar_width, health_bar_height)))
             pygame.draw.rect(screen, (0, 255, 0), 
-                            (self.x - health_bar_width//2, 
-                             self.y - self.height//2 - 10 + wobble_offset, 
+                            (x - health_bar_width//2, 
+                             y - self.height//2 - 10 + wobble_offset, 
                              health_bar_width * health_ratio, health_bar_height))
+        return rect
         
     def take_damage(self, damage):
         self.health -= damage
@@ -250,12 +229,16 @@ class Enemy:
         # Play hit sound
         sound_manager.play('enemy_hit')
         
+        # Knock some fur off, in the cat's color
+        particle_system.burst(self.x, self.y, FUR, HIT_PARTICLES, self.color)
+        
         if self.health <= 0:
             # Play death sound
             sound_manager.play('enemy_death')
             
-            # Add death animation
+            # Add death animation and a big puff of fur
             animation_manager.add_explosion(self.x, self.y)
+            particle_system.burst(self.x, self.y, FUR, DEATH_PARTICLES, self.color)
             
             return True  # Enemy died
         return False
@@ -264,12 +247,223 @@ class Enemy:
         """Attack the wall if cooldown allows"""
         if self.at_wall and self.attack_cooldown <= 0:
             self.attack_cooldown = self.attack_cooldown_max
+            self.wall_hit_effects()
+            return wall.take_damage(self.damage)
+        return False
+        
+    def wall_hit_effects(self):
+        """Play the sound and animation for one attack on the wall"""
+        # Play wall hit sound
+        sound_manager.play('wall_hit')
+        
+        # Add hit animation
+        animation_manager.add_hit(self.x + self.width//2, self.y)
+        
+        # Sparks and brick chips fly back towards the enemy side
+        particle_system.burst(self.x + self.width//2, self.y, SPARK, WALL_SPARKS, direction=math.pi, spread=math.pi)
+        particle_system.burst(self.x + self.width//2, self.y, DEBRIS, WALL_DEBRIS, direction=math.pi, spread=math.pi)
+
+class EnemyPool(ArrayPool):
+    """Struct-of-arrays store for every live enemy.
+
+    Each enemy owns one row of contiguous NumPy arrays, and movement, wall
+    arrival, attack cooldowns and wall damage are computed for all rows at
+    once. Iterating the pool yields Enemy handles.
+    """
+    FIELDS = (
+        ('x', np.float64, ()),
+        ('y', np.float64, ()),
+        ('prev_x', np.float64, ()),
+        ('prev_y', np.float64, ()),
+        ('speed', np.float64, ()),
+        ('health', np.float64, ()),
+        ('max_health', np.float64, ()),
+        ('half_width', np.int32, ()),
+        ('damage', np.int32, ()),
+        ('attack_cooldown', np.int32, ()),
+        ('hit_flash', np.int32, ()),
+        ('wobble', np.float64, ()),
+        ('wobble_dir', np.float64, ()),
+        ('wobble_speed', np.float64, ()),
+        ('wobble_amount', np.float64, ()),
+        ('enemy_type', np.int8, ()),
+        ('at_wall', np.bool_, ()),
+    )
+    
+    def __init__(self, capacity=64):
+        super().__init__(Enemy, capacity)
+        
+        # Per-type (sprite, flash sprite, health bars), filled in as types spawn.
+        # None if the type's sprite couldn't be loaded and draws as a placeholder.
+        self.type_sprites = {}
+        
+        # Enemy speed and health scaling, always 1 in real games; only the
+        # balance sweep changes them, through headless.create_game
+        self.speed_multiplier = 1.0
+        self.health_multiplier = 1.0
+        
+    def spawn(self, x, y, enemy_type=ENEMY_NORMAL):
+        """Add an enemy and return its handle"""
+        i = self.next_row()
+        stats = ENEMY_STATS[enemy_type]
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        
+        # Apply the balance multipliers to speed and health
+        self.speed[i] = stats['speed'] * self.speed_multiplier
+        health = stats['health'] * self.health_multiplier
+        self.health[i] = health
+        self.max_health[i] = health
+        self.half_width[i] = stats['width'] // 2
+        self.damage[i] = stats['damage']
+        self.attack_cooldown[i] = 0
+        self.hit_flash[i] = 0
+        self.enemy_type[i] = enemy_type
+        self.at_wall[i] = False
+        
+        # Animation properties
+        self.wobble[i] = 0
+        self.wobble_dir[i] = 1
+        self.wobble_speed[i] = rng.wobble.uniform(0.1, 0.2)
+        self.wobble_amount[i] = rng.wobble.uniform(1, 3)
+        
+        enemy = self.acquire(self, enemy_type)
+        if enemy_type not in self.type_sprites:
+            self.type_sprites[enemy_type] = self.load_type_sprites(enemy)
+        return enemy
+        
+    def load_type_sprites(self, enemy):
+        """Collect a type's sprites from one of its handles, with its baked health bars"""
+        if enemy.sprite_placeholder:
+            return None
+        width = enemy.sprite.get_width()
+        bars = sprite_cache.get(('health_bar', width), lambda: build_health_bars(width))
+        return enemy.sprite, enemy.flash_sprite, bars
+        
+    def snapshot(self, into=None):
+        """Return a frozen copy of the pool for drawing, see ArrayPool.snapshot"""
+        snapshot = super().snapshot(into)
+        snapshot.type_sprites = dict(self.type_sprites)
+        
+        # Placeholder shapes draw through the handles, which must read the copied rows
+        if None in self.type_sprites.values():
+            snapshot.items = [copy.copy(enemy) for enemy in snapshot.items]
+            for enemy in snapshot.items:
+                enemy.pool = snapshot
+        return snapshot
+        
+    def update(self, wall):
+        """Advance every enemy one frame and let those at the wall attack it.
+
+        Returns True if the wall was destroyed this frame.
+        """
+        n = len(self.items)
+        if n == 0:
+            return False
             
-            # Play wall hit sound
-            sound_manager.play('wall_hit')
+        # Remember where everyone was for render interpolation
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        
+        # Update attack cooldown and hit flash effect
+        cooldown = self.attack_cooldown[:n]
+        np.subtract(cooldown, 1, out=cooldown, where=cooldown > 0)
+        hit_flash = self.hit_flash[:n]
+        np.subtract(hit_flash, 1, out=hit_flash, where=hit_flash > 0)
+        
+        # Update wobble animation
+        wobble = self.wobble[:n]
+        wobble_dir = self.wobble_dir[:n]
+        wobble += self.wobble_speed[:n] * wobble_dir
+        wobble_dir[np.abs(wobble) > self.wobble_amount[:n]] *= -1
+        
+        # Target is just in front of the wall, on the enemy's own row, so
+        # movement is purely horizontal
+        x = self.x[:n]
+        target_x = wall.x - self.half_width[:n] - wall.width // 2
+        dx = target_x - x
+        arrived = np.abs(dx) < 5
+        self.at_wall[:n] |= arrived
+        x += np.where(arrived, 0.0, np.sign(dx) * self.speed[:n])
+        
+        # Enemies at the wall attack when cooldown allows
+        attacking = self.at_wall[:n] & (cooldown <= 0)
+        if not attacking.any():
+            return False
             
-            # Add hit animation
-            animation_manager.add_hit(self.x + self.width//2, self.y)
+        # One hit per attacker, like Enemy.attack_wall, so the wall's flash and
+        # hit position follow each hit
+        cooldown[attacking] = ATTACK_COOLDOWN_MAX
+        destroyed = False
+        for i in np.flatnonzero(attacking):
+            self.items[i].wall_hit_effects()
+            destroyed |= wall.take_damage(self.damage[i].item())
+        return destroyed
+        
+    def draw(self, screen, alpha=1.0, return_rects=True):
+        """Draw every enemy and its health bar with one blits call.
+        
+        Returns the area drawn over for each enemy, or an empty list if
+        return_rects is off and nobody needs them.
+        """
+        n = len(self.items)
+        if n == 0:
+            return []
             
-            return wall.take_damage(self.damage)
-        return False
+        types = self.enemy_type[:n]
+        type_sprites = [self.type_sprites.get(t) for t in range(max(ENEMY_STATS) + 1)]
+        if any(type_sprites[t] is None for t in np.unique(types)):
+            # Placeholder shapes can't be batched, draw enemy by enemy
+            rects = [enemy.draw(screen, alpha) for enemy in self.items]
+            return rects if return_rects else []
+            
+        # Interpolate between the last two simulation ticks
+        prev_x = self.prev_x[:n]
+        prev_y = self.prev_y[:n]
+        x = prev_x + (self.x[:n] - prev_x) * alpha
+        y = prev_y + (self.y[:n] - prev_y) * alpha
+        
+        # Center the sprites on the enemies, with the wobble applied to y
+        sprite_sizes = np.array([sprites[0].get_size() if sprites else (0, 0) for sprites in type_sprites])
+        sprite_x = x - sprite_sizes[types, 0] // 2
+        sprite_y = y - sprite_sizes[types, 1] // 2
+        if quality_governor.enabled('wobble'):
+            sprite_y += self.wobble[:n]
+        
+        # Flash on even hit_flash frames
+        hit_flash = self.hit_flash[:n]
+        flashing = (hit_flash > 0) & (hit_flash % 2 == 0)
+        
+        # Green part of the bar in whole pixels, like a filled rect of the exact width would be
+        bar_width = sprite_sizes[types, 0]
+        health_ratio = self.health[:n] / self.max_health[:n]
+        green = np.clip((bar_width * health_ratio).astype(int), 0, bar_width)
+        
+        health_bars = quality_governor.enabled('health_bars')
+        rects = screen.blits(self.sprite_sequence(type_sprites, types.tolist(), flashing.tolist(),
+                                                  green.tolist(), sprite_x.tolist(), sprite_y.tolist(),
+                                                  health_bars),
+                             return_rects)
+        if not return_rects or not health_bars:
+            return rects if return_rects else []
+            
+        # One area per enemy, sprite and bar together
+        return [sprite.union(bar) for sprite, bar in zip(rects[::2], rects[1::2])]
+        
+    def sprite_sequence(self, type_sprites, types, flashing, green, sprite_x, sprite_y, health_bars=True):
+        """Yield (surface, position) for each enemy's sprite, then its health bar"""
+        for enemy_type, flash_now, bar, x, y in zip(types, flashing, green, sprite_x, sprite_y):
+            sprite, flash_sprite, bars = type_sprites[enemy_type]
+            yield (flash_sprite if flash_now else sprite), (x, y)
+            if health_bars:
+                yield bars[bar], (x, y - HEALTH_BAR_OFFSET)
+            
+def build_health_bars(width):
+    """Every fill level of a health bar, indexed by the width of its green part in pixels"""
+    bars = []
+    for green in range(width + 1):
+        bar = pygame.Surface((width, HEALTH_BAR_HEIGHT))
+        bar.fill(RED)
+        bar.fill(GREEN, (0, 0, green, HEALTH_BAR_HEIGHT))
+        bars.append(bar)
+    return SpriteSheet(bars)
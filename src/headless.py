@@ -0,0 +1,175 @@
+"""Headless simulation runner for balance and regression batches.
+
+Runs the game with SDL's dummy video and audio drivers, never draws, and
+steps Game.update as fast as the CPU allows while a scripted bot aims and
+fires. Run from the src directory:
+
+    python headless.py --waves 20 --difficulty hard --seed 42
+
+Runs can be recorded with --record FILE, and a recording (from here or from
+the game itself) re-simulated with --replay FILE.
+"""
+import os
+
+# The dummy drivers must be selected before pygame is first imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import contextlib
+import json
+import sys
+import time
+
+import numpy as np
+
+# Keep asset-loading chatter off stdout, which carries the run report
+with contextlib.redirect_stdout(sys.stderr):
+    import main
+from replay import ReplayPlayer, ReplayError
+from rng import seed_argument
+from settings import game_settings, DIFFICULTY_EASY, DIFFICULTY_NORMAL, DIFFICULTY_HARD
+
+DIFFICULTIES = {
+    'easy': DIFFICULTY_EASY,
+    'normal': DIFFICULTY_NORMAL,
+    'hard': DIFFICULTY_HARD,
+}
+
+DEFAULT_MAX_TICKS = 60 * 60 * 60 * 10  # Ten hours of gameplay at 60 ticks per second
+
+class AimBot:
+    """Scripted player: holds the trigger and leads the enemy closest to the wall"""
+    def __init__(self, game):
+        self.game = game
+
+    def act(self):
+        """Set the game's aim and trigger for the coming tick"""
+        game = self.game
+        enemies = game.enemies
+        n = len(enemies.items)
+        if n == 0:
+            game.mouse_pressed = False
+            return
+
+        # Target whoever is furthest right, i.e. closest to the wall
+        i = int(np.argmax(enemies.x[:n]))
+        target_x = enemies.x.item(i)
+        target_y = enemies.y.item(i)
+
+        # Lead moving targets by the bullet's travel time
+        if not enemies.at_wall.item(i):
+            travel_ticks = abs(game.player.x - target_x) / 13
+            target_x += enemies.speed.item(i) * travel_ticks
+
+        # Aim at whole pixels like a real mouse, so recording a run doesn't change it
+        game.mouse_pos = (round(target_x), round(target_y))
+        game.mouse_pressed = True
+
+def create_game(difficulty=DIFFICULTY_NORMAL, seed=None, record_path=None, enemy_speed=1.0, enemy_health=1.0):
+    """Build a headless game that is already in the PLAYING state.
+
+    enemy_speed and enemy_health scale every enemy's stats, for balance
+    sweeps; real games always play with both at 1.
+    """
+    # Set directly rather than through set_difficulty, which would save settings.json
+    game_settings.difficulty = difficulty
+
+    game = main.Game(headless=True, seed=seed, record_path=record_path)
+    game.enemies.speed_multiplier = enemy_speed
+    game.enemies.health_multiplier = enemy_health
+    game.state = main.PLAYING
+    return game
+
+def run(game, waves=None, max_ticks=DEFAULT_MAX_TICKS, bot=None):
+    """Step a PLAYING game until it ends and return its summary.
+
+    The run ends when the wall falls, when wave `waves` has been cleared,
+    after max_ticks ticks, or when a replay runs out of input.
+    """
+    ticks = 0
+    start = time.perf_counter()
+    while ticks < max_ticks and game.state == main.PLAYING:
+        if game.replay and game.replay.finished:
+            break  # Recording ended with the game still running
+        if bot:
+            bot.act()
+        game.update()
+        ticks += 1
+
+        if waves is not None and game.wave >= waves and len(game.enemies) == 0:
+            break
+    elapsed = time.perf_counter() - start
+    game.finish_recording()
+
+    return {
+        'seed': game.seed,
+        'difficulty': game_settings.difficulty,
+        'ticks': ticks,
+        'wave': game.wave,
+        'score': game.player.score,
+        'kills': game.player.kills,
+        'wall_health': game.wall.health,
+        'game_over': game.state == main.GAME_OVER,
+        'elapsed': elapsed,
+        'ticks_per_second': ticks / elapsed if elapsed > 0 else 0.0,
+        'game_seconds': ticks / game.tick_rate,
+    }
+
+def simulate(waves=None, difficulty=DIFFICULTY_NORMAL, seed=None, max_ticks=DEFAULT_MAX_TICKS, bot=True,
+             record_path=None, enemy_speed=1.0, enemy_health=1.0):
+    """Run one headless game and return its summary, see run() and create_game()"""
+    game = create_game(difficulty, seed, record_path, enemy_speed, enemy_health)
+    return run(game, waves, max_ticks, AimBot(game) if bot else None)
+
+def replay(path, seek_wave=None, max_ticks=DEFAULT_MAX_TICKS):
+    """Re-simulate a recorded game and return its summary.
+
+    With seek_wave, the ticks before that wave are fast-forwarded untimed
+    and the summary covers only the rest of the recording.
+    """
+    recording = ReplayPlayer.load(path)
+    game = main.Game(headless=True)
+    game.start_replay(recording)
+    if seek_wave and not game.seek_replay(seek_wave):
+        raise ReplayError(f"{path} never reaches wave {seek_wave}")
+    return run(game, max_ticks=max_ticks)
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Run Catpocalypse headless as fast as possible.")
+    parser.add_argument('--waves', type=int, default=None,
+                        help="stop once this wave has been cleared (default: play until the wall falls)")
+    parser.add_argument('--difficulty', choices=sorted(DIFFICULTIES), default='normal')
+    parser.add_argument('--seed', type=seed_argument, default=None, help="random seed for a reproducible run")
+    parser.add_argument('--max-ticks', type=int, default=DEFAULT_MAX_TICKS,
+                        help="hard limit on simulated ticks")
+    parser.add_argument('--no-bot', action='store_true', help="leave the player idle instead of using the aim bot")
+    parser.add_argument('--json', action='store_true', help="print the summary as JSON")
+    parser.add_argument('--record', metavar='FILE', help="record the run's input to FILE")
+    parser.add_argument('--replay', metavar='FILE',
+                        help="re-simulate a recorded game instead of playing a new one")
+    parser.add_argument('--seek-wave', type=int, metavar='N', help="with --replay, skip ahead to wave N")
+    args = parser.parse_args(argv)
+
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.replay:
+            try:
+                result = replay(args.replay, args.seek_wave, args.max_ticks)
+            except (OSError, ReplayError) as e:
+                parser.error(str(e))
+        else:
+            result = simulate(args.waves, DIFFICULTIES[args.difficulty], args.seed, args.max_ticks,
+                              not args.no_bot, args.record)
+
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"Reached wave {result['wave']} with score {result['score']} "
+              f"({result['kills']} kills, wall {result['wall_health']})")
+        print(f"{result['ticks']} ticks ({result['game_seconds']:.0f} s of gameplay) "
+              f"in {result['elapsed']:.2f} s: {result['ticks_per_second']:.0f} ticks/s, "
+              f"{result['game_seconds'] / max(result['elapsed'], 1e-9):.0f}x real time")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
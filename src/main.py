@@ -1,19 +1,31 @@
 import pygame
 import sys
-import random
 import math
 import os
+import time
+import argparse
 from pygame.locals import *
 
 # Import our modules
 from player import Player
-from enemy import Enemy, ENEMY_NORMAL, ENEMY_FAST, ENEMY_TANK
+from enemy import EnemyPool, ENEMY_NORMAL, ENEMY_FAST, ENEMY_TANK
 from wall import Wall
-from bullet import Bullet
+from bullet import BulletPool, BULLET_RADIUS
 from powerup import PowerUp, spawn_random_powerup, POWERUP_UNLIMITED_AMMO, POWERUP_FIRE_RATE
 from sound_manager import sound_manager
 from settings import game_settings, DIFFICULTY_EASY, DIFFICULTY_NORMAL, DIFFICULTY_HARD
 from animation import animation_manager
+from particles import particle_system
+from pool import Pool
+from spatial_grid import SpatialGrid
+from rng import rng
+from replay import InputRecorder, ReplayPlayer, ReplayError
+from text_cache import text_cache
+from overlay_cache import overlay_cache
+from quality import quality_governor, QUALITY_LEVELS
+from dirty_renderer import DirtyRectRenderer
+from pipeline import SimulationThread
+from profiler import frame_profiler, EVENTS, UPDATE, ANIMATIONS, BULLETS, ENEMIES, COLLISIONS, DRAW
 
 # Initialize pygame
 pygame.init()
@@ -28,6 +40,12 @@ SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 FPS = 60
 
+# Fixed-timestep loop limits
+TICK_RATE = 60  # Simulation ticks per second, every speed, cooldown and timer is tuned for it
+MAX_FRAME_TIME = 0.25  # Longest real-time gap one frame may feed the simulation, in seconds
+MAX_TICKS_PER_FRAME = 8  # Past this the simulation can't keep up and drops the backlog
+STATIC_SCREEN_FPS = 30  # Frame rate cap for menus and frozen screens, which only change on input
+
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -46,20 +64,56 @@ PAUSED = 3
 SETTINGS = 4
 
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False, seed=None, record_path=None, profile_path=None, dirty_rects=None,
+                 pipelined=None):
+        # Headless games never draw or make sound, see headless.py
+        self.headless = headless
+        
+        # Frame timing overlay and CSV dumps, see profiler.py
+        self.profile_path = profile_path  # Dump target for F4 and on quit
+        frame_profiler.visible = game_settings.show_fps and not headless
+        
+        # Input recording and replay, see replay.py
+        self.record_path = record_path  # Each game played is recorded here, replacing the last
+        self.recorder = None
+        self.replay = None
+        
         # Set up display
         self.screen_flags = 0
-        if game_settings.fullscreen:
+        if game_settings.fullscreen and not headless:
             self.screen_flags = pygame.FULLSCREEN
             
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), self.screen_flags)
         pygame.display.set_caption("ratpocalypse")
         self.clock = pygame.time.Clock()
         
+        # Present only the changed parts of the screen, see dirty_renderer.py
+        if dirty_rects is None:
+            dirty_rects = game_settings.dirty_rects
+        self.dirty_renderer = DirtyRectRenderer(self.screen.get_size()) if dirty_rects else None
+        
+        # Run ticks on a worker thread while the last frame draws, see pipeline.py
+        if pipelined is None:
+            pipelined = game_settings.pipelined
+        self.pipeline = SimulationThread(self) if pipelined and not headless else None
+        
+        # Simulation runs at a fixed tick rate, rendering as fast as max_fps allows.
+        # Gameplay timers and speeds are counted in ticks, so the rate is not a setting.
+        self.tick_rate = TICK_RATE
+        self.max_fps = game_settings.max_fps
+        self.accumulator = 0.0
+        
+        # Visual detail follows measured frame time, see quality.py
+        quality_governor.set_target_fps(self.max_fps)
+        quality_governor.adaptive = game_settings.adaptive_quality
+        
         # Load fonts
-        self.font = pygame.font.SysFont(None, 36)
-        self.small_font = pygame.font.SysFont(None, 24)
-        self.large_font = pygame.font.SysFont(None, 48)
+        self.font = text_cache.font(36)
+        self.small_font = text_cache.font(24)
+        self.large_font = text_cache.font(48)
+        
+        # Composed menu, settings, pause and game over screens: state -> (inputs, surface)
+        self.static_screens = {}
         
         # Game state
         self.state = MENU
@@ -68,24 +122,50 @@ class Game:
         self.wave_cooldown = 300  # 5 seconds at 60 FPS
         self.enemies_per_wave = 5
         self.mouse_pressed = False  # Track mouse button state
+        self.mouse_pos = (0, 0)  # Aim point, refreshed from the mouse in handle_events
+        self.reload_requested = False  # Reload key pressed since the last tick
+        
+        # Pooled entity containers, reused across games
+        self.bullets = BulletPool(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.enemies = EnemyPool()
+        self.powerups = Pool(PowerUp)
+        
+        # Collision broad-phase grids, rebuilt every tick
+        self.enemy_grid = SpatialGrid(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.powerup_grid = SpatialGrid(SCREEN_WIDTH, SCREEN_HEIGHT)
         
         # Set volume from settings
         sound_manager.set_volume(game_settings.sound_volume)
         sound_manager.set_music_volume(game_settings.music_volume)
         
         # Start background music
-        sound_manager.play_music()
+        if headless:
+            sound_manager.sound_enabled = False
+        else:
+            sound_manager.play_music()
         
         # Reset game
-        self.reset_game()
+        self.reset_game(seed)
         
     def handle_events(self):
+        self.mouse_pos = pygame.mouse.get_pos()
+        
         for event in pygame.event.get():
             if event.type == QUIT:
-                pygame.quit()
-                sys.exit()
+                self.quit()
+                
+            # The window was uncovered, or a key may change a static screen, so draw it all again
+            if self.dirty_renderer and (event.type in (VIDEOEXPOSE, WINDOWEXPOSED) or
+                                        (event.type == KEYDOWN and self.state != PLAYING)):
+                self.dirty_renderer.invalidate()
                 
             if event.type == KEYDOWN:
+                # Frame timing overlay works on every screen
+                if event.key == K_F3:
+                    frame_profiler.visible = game_settings.toggle_show_fps()
+                elif event.key == K_F4:
+                    self.dump_profile()
+                    
                 if event.key == K_ESCAPE:
                     if self.state == PLAYING:
                         self.state = PAUSED
@@ -95,13 +175,13 @@ class Game:
                         self.state = PLAYING
                         sound_manager.unpause_music()  # Resume music when game is unpaused
                     elif self.state == MENU:
-                        pygame.quit()
-                        sys.exit()
+                        self.quit()
                     elif self.state == SETTINGS:
                         self.state = MENU
                         
                 if self.state == PAUSED:
                     if event.key == K_q:
+                        self.finish_recording()
                         self.state = MENU
                         sound_manager.play('menu_select')
                         sound_manager.play_music()  # Resume music when returning to menu
@@ -128,11 +208,10 @@ class Game:
                     elif event.key == K_f:
                         fullscreen = game_settings.toggle_fullscreen()
                         sound_manager.play('menu_select')
-                        # Update screen mode
-                        if fullscreen:
-                            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.FULLSCREEN)
-                        else:
-                            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+                        self.set_display_mode(fullscreen)
+                    elif event.key == K_t:
+                        frame_profiler.visible = game_settings.toggle_show_fps()
+                        sound_manager.play('menu_select')
                     elif event.key == K_m:
                         # Toggle music
                         music_enabled = sound_manager.toggle_music()
@@ -169,10 +248,11 @@ class Game:
                     
                 if self.state == PLAYING:
                     if event.key == K_r:
-                        self.player.reload()
+                        self.reload_requested = True
                     elif event.key == K_p:
                         self.state = PAUSED
                     elif event.key == K_q:
+                        self.finish_recording()
                         self.state = MENU
                         sound_manager.play('menu_select')
                         sound_manager.play_music()  # Resume music when returning to menu
@@ -207,7 +287,15 @@ class Game:
                 if self.state == PLAYING:
                     self.mouse_pressed = False
 
-    def reset_game(self):
+    def reset_game(self, seed=None):
+        # Reseed every random stream, so the game can be reproduced from self.seed
+        self.seed = rng.seed(seed)
+        
+        # Any replay in progress belongs to the previous game
+        self.replay = None
+        if self.record_path:
+            self.recorder = InputRecorder(self.seed, game_settings.difficulty, self.tick_rate)
+            
         # Create wall
         self.wall = Wall(SCREEN_WIDTH, SCREEN_HEIGHT)
         
@@ -223,15 +311,17 @@ class Game:
         self.player.max_health = int(100 * player_health_multiplier)
         self.player.health = self.player.max_health
         
-        self.bullets = []
-        self.enemies = []
-        self.powerups = []
+        self.bullets.clear()
+        self.enemies.clear()
+        self.powerups.clear()
+        particle_system.clear()
         self.wave = 0  # Initialize wave count to 0
         self.wave_timer = self.wave_cooldown
         self.spawning_wave = False
         self.game_over_reason = ""
         self.paused_time = 0
         self.mouse_pressed = False
+        self.reload_requested = False
 
     def spawn_wave(self):
         self.spawning_wave = True
@@ -249,16 +339,16 @@ class Game:
         
         for i in range(enemies_to_spawn):
             # Spawn enemies only from the left side
-            x = random.randint(-100, -50)
-            y = random.randint(50, SCREEN_HEIGHT - 50)
+            x = rng.spawn.randint(-100, -50)
+            y = rng.spawn.randint(50, SCREEN_HEIGHT - 50)
             
             # Determine enemy type based on wave and random chance
             if self.wave < 3:
                 # Early waves: mostly normal enemies, some fast enemies
-                enemy_type = ENEMY_NORMAL if random.random() < 0.8 else ENEMY_FAST
+                enemy_type = ENEMY_NORMAL if rng.spawn.random() < 0.8 else ENEMY_FAST
             elif self.wave < 5:
                 # Mid waves: mix of all types, but more normal enemies
-                rand = random.random()
+                rand = rng.spawn.random()
                 if rand < 0.6:
                     enemy_type = ENEMY_NORMAL
                 elif rand < 0.85:
@@ -267,16 +357,35 @@ class Game:
                     enemy_type = ENEMY_TANK
             else:
                 # Later waves: even distribution of all types
-                enemy_type = random.choice([ENEMY_NORMAL, ENEMY_FAST, ENEMY_TANK])
+                enemy_type = rng.spawn.choice([ENEMY_NORMAL, ENEMY_FAST, ENEMY_TANK])
                 
-            self.enemies.append(Enemy(x, y, enemy_type))
+            self.enemies.spawn(x, y, enemy_type)
         
         self.spawning_wave = False
                         
     def update(self):
         if self.state == PLAYING:
-            # Update animations
+            # Start counting this tick's allocations
+            for pool in self.entity_pools().values():
+                pool.begin_frame()
+                
+            # Take this tick's input from the replay, or record it
+            if self.replay:
+                if not self.replay.apply(self):
+                    self.end_replay()
+                    return
+            elif self.recorder:
+                self.recorder.capture(self)
+                
+            if self.reload_requested:
+                self.reload_requested = False
+                self.player.reload()
+                
+            # Update animations and particles
+            start = frame_profiler.clock()
             animation_manager.update()
+            particle_system.update()
+            frame_profiler.add(ANIMATIONS, start)
             
             # Handle continuous shooting when mouse button is held down
             if self.mouse_pressed:
@@ -288,47 +397,41 @@ class Game:
                     # Apply damage multiplier
                     damage = 25 * self.player.damage_multiplier
                     
-                    self.bullets.append(Bullet(bullet_x, bullet_y, self.player.angle, damage))
+                    self.bullets.spawn(bullet_x, bullet_y, self.player.angle, damage)
             
             # Update player angle based on mouse position
-            mouse_x, mouse_y = pygame.mouse.get_pos()
+            mouse_x, mouse_y = self.mouse_pos
             dx = mouse_x - self.player.x
             dy = mouse_y - self.player.y
             self.player.angle = math.degrees(math.atan2(dy, dx))
             
-            # Update player
+            # Update player and wall
             self.player.update(self.wall.x)
+            self.wall.update()
             
             # Update bullets
-            for bullet in self.bullets[:]:
-                bullet.update()
-                if bullet.is_dead():
-                    self.bullets.remove(bullet)
+            start = frame_profiler.clock()
+            self.bullets.update()
+            frame_profiler.add(BULLETS, start)
                     
-            # Update enemies
-            for enemy in self.enemies[:]:
-                # Calculate the target position just in front of the wall
-                target_x = self.wall.x - enemy.width//2 - self.wall.width//2
-                target_y = enemy.y  # Keep the same y-coordinate to move straight to the wall
-                
-                # Update enemy
-                enemy.update(target_x, target_y)
-                
-                # If at wall, attack when cooldown allows
-                if enemy.at_wall:
-                    if enemy.attack_wall(self.wall):
-                        self.state = GAME_OVER
-                        self.game_over_reason = "Your wall was destroyed!"
-                        sound_manager.pause_music()  # Pause background music
-                        sound_manager.play('game_over')
+            # Update enemies and let those at the wall attack it
+            start = frame_profiler.clock()
+            wall_destroyed = self.enemies.update(self.wall)
+            frame_profiler.add(ENEMIES, start)
+            if wall_destroyed:
+                self.state = GAME_OVER
+                self.game_over_reason = "Your wall was destroyed!"
+                sound_manager.pause_music()  # Pause background music
+                sound_manager.play('game_over')
+                self.finish_recording()
                 
             # Update powerups
-            for powerup in self.powerups[:]:
+            for powerup in self.powerups:
                 powerup.update()
                 
                 # Check if powerup is expired
                 if powerup.is_expired():
-                    self.powerups.remove(powerup)
+                    self.powerups.release(powerup)
                     continue
                     
                 # Check if player collected powerup
@@ -353,52 +456,13 @@ class Game:
                     animation_manager.add_text(powerup.x, powerup.y - 20, message, YELLOW, 24)
                     
                     # Remove powerup
-                    self.powerups.remove(powerup)
+                    self.powerups.release(powerup)
                 
-            # Check bullet collisions with enemies
-            for bullet in self.bullets[:]:
-                for enemy in self.enemies[:]:
-                    if (abs(bullet.x - enemy.x) < enemy.width // 2 + bullet.radius and
-                        abs(bullet.y - enemy.y) < enemy.height // 2 + bullet.radius):
-                        
-                        if enemy.take_damage(bullet.damage):
-                            self.enemies.remove(enemy)
-                            self.player.score += 100
-                            self.player.kills += 1
-                            
-                            # Chance to spawn a powerup when enemy dies
-                            powerup_chance = game_settings.get_difficulty_setting('powerup_chance')
-                            if random.random() < powerup_chance:
-                                # Spawn powerup at enemy position
-                                self.powerups.append(PowerUp(enemy.x, enemy.y))
-                                
-                        if bullet in self.bullets:  # Check if bullet still exists
-                            self.bullets.remove(bullet)
-                        break
-                        
-            # Check bullet collisions with powerups
-            for bullet in self.bullets[:]:
-                for powerup in self.powerups[:]:
-                    if (abs(bullet.x - powerup.x) < powerup.radius + bullet.radius and
-                        abs(bullet.y - powerup.y) < powerup.radius + bullet.radius):
-                        
-                        # Apply powerup effect
-                        message = powerup.apply_effect(self.player)
-                        
-                        # Play powerup sound
-                        sound_manager.play('powerup')
-                        
-                        # Add powerup animation
-                        animation_manager.add_powerup(powerup.x, powerup.y)
-                        
-                        # Add text animation
-                        animation_manager.add_text(powerup.x, powerup.y - 20, message, YELLOW, 24)
-                        
-                        # Remove powerup and bullet
-                        self.powerups.remove(powerup)
-                        if bullet in self.bullets:  # Check if bullet still exists
-                            self.bullets.remove(bullet)
-                        break
+            # Check bullet collisions with enemies and powerups
+            start = frame_profiler.clock()
+            self.check_bullet_enemy_collisions()
+            self.check_bullet_powerup_collisions()
+            frame_profiler.add(COLLISIONS, start)
             
             # Wave management
             if len(self.enemies) == 0 and not self.spawning_wave:
@@ -408,33 +472,258 @@ class Game:
                     self.wave += 1
                     self.spawn_wave()
                     self.wave_timer = self.wave_cooldown
+                    
+            # Swap-remove everything released this tick
+            self.bullets.compact()
+            self.enemies.compact()
+            self.powerups.compact()
+            
+    def set_display_mode(self, fullscreen):
+        """Switch between windowed and fullscreen, rebuilding surfaces tied to the display format"""
+        # Update screen mode
+        if fullscreen:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.FULLSCREEN)
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            
+        # Converted overlays, playfield layers and composed screens are rebuilt on next use
+        overlay_cache.clear()
+        self.wall.layers.clear()
+        self.static_screens.clear()
+        if self.dirty_renderer:
+            self.dirty_renderer.invalidate()
+            
+    def finish_recording(self):
+        """Save the current game's input recording, if one is running"""
+        if self.recorder:
+            self.recorder.save(self.record_path)
+            print(f"Saved replay of {self.recorder.ticks} ticks to {self.record_path}")
+            self.recorder = None
+            
+    def quit(self):
+        """Save anything pending and exit"""
+        self.finish_recording()
+        if self.profile_path:
+            self.dump_profile()
+        pygame.quit()
+        sys.exit()
+        
+    def dump_profile(self):
+        """Write the frame timing history to CSV"""
+        path = self.profile_path or time.strftime("frame_profile_%Y%m%d_%H%M%S.csv")
+        frames = frame_profiler.dump_csv(path)
+        print(f"Saved {frames} frame timings to {path}")
+        
+    def start_replay(self, replay):
+        """Start a new game that plays back a recording"""
+        # Set directly rather than through set_difficulty, which would save settings.json
+        game_settings.difficulty = replay.difficulty
+        self.record_path = None
+        self.recorder = None
+        self.reset_game(replay.seed)
+        self.replay = replay
+        self.state = PLAYING
+        
+    def seek_replay(self, wave):
+        """Fast-forward the replay to the start of a wave, without sound"""
+        sound_enabled = sound_manager.sound_enabled
+        sound_manager.sound_enabled = False
+        found = self.replay.seek(self, wave)
+        sound_manager.sound_enabled = sound_enabled
+        return found
+        
+    def end_replay(self):
+        """Stop at the end of a recording that didn't finish the game"""
+        self.replay = None
+        self.state = GAME_OVER
+        self.game_over_reason = "Replay ended"
+        
+    @property
+    def animations(self):
+        """The live animations, drawn like a snapshot's copies of them"""
+        return animation_manager.animations
+        
+    @property
+    def particles(self):
+        """The live particle system, drawn like a snapshot's copy of it"""
+        return particle_system
+        
+    def entity_pools(self):
+        """Return the pooled entity containers by name"""
+        return {
+            'bullets': self.bullets,
+            'enemies': self.enemies,
+            'powerups': self.powerups,
+            'animations': animation_manager.animations,
+        }
+        
+    def frame_allocations(self):
+        """Return how many entity objects each pool had to allocate this tick"""
+        return {name: pool.frame_allocations for name, pool in self.entity_pools().items()}
 
-    def draw(self):
-        if self.state == MENU:
-            self.draw_menu()
-        elif self.state == PLAYING:
-            self.draw_game()
-        elif self.state == GAME_OVER:
-            self.draw_game_over()
-        elif self.state == PAUSED:
-            self.draw_game()  # Draw game in background
-            self.draw_pause_menu()
-        elif self.state == SETTINGS:
-            self.draw_settings()
+    def check_bullet_enemy_collisions(self):
+        """Resolve bullet hits on enemies, testing each bullet only against its grid cell"""
+        if not self.bullets or not self.enemies:
+            return
+            
+        # Index enemies by hitbox, padded by the bullet radius
+        grid = self.enemy_grid
+        grid.clear()
+        for enemy in self.enemies:
+            if not enemy.alive:
+                continue
+            grid.insert(enemy, enemy.x, enemy.y,
+                        enemy.width // 2 + BULLET_RADIUS, enemy.height // 2 + BULLET_RADIUS)
+            
+        for bullet in self.bullets:
+            if not bullet.alive:
+                continue
+            for enemy in grid.query_point(bullet.x, bullet.y):
+                if not enemy.alive:
+                    continue
+                if (abs(bullet.x - enemy.x) < enemy.width // 2 + bullet.radius and
+                    abs(bullet.y - enemy.y) < enemy.height // 2 + bullet.radius):
+                    
+                    if enemy.take_damage(bullet.damage):
+                        self.enemies.release(enemy)
+                        self.player.score += 100
+                        self.player.kills += 1
+                        
+                        # Chance to spawn a powerup when enemy dies
+                        powerup_chance = game_settings.get_difficulty_setting('powerup_chance')
+                        if rng.drop.random() < powerup_chance:
+                            # Spawn powerup at enemy position
+                            self.powerups.acquire(enemy.x, enemy.y)
+                            
+                    self.bullets.release(bullet)
+                    break
+            
+    def check_bullet_powerup_collisions(self):
+        """Let bullets collect powerups, testing each bullet only against its grid cell"""
+        if not self.bullets or not self.powerups:
+            return
+            
+        grid = self.powerup_grid
+        grid.clear()
+        for powerup in self.powerups:
+            if not powerup.alive:
+                continue
+            reach = powerup.radius + BULLET_RADIUS
+            grid.insert(powerup, powerup.x, powerup.y, reach, reach)
+            
+        for bullet in self.bullets:
+            if not bullet.alive:
+                continue
+            for powerup in grid.query_point(bullet.x, bullet.y):
+                if not powerup.alive:
+                    continue
+                if (abs(bullet.x - powerup.x) < powerup.radius + bullet.radius and
+                    abs(bullet.y - powerup.y) < powerup.radius + bullet.radius):
+                    
+                    # Apply powerup effect
+                    message = powerup.apply_effect(self.player)
+                    
+                    # Play powerup sound
+                    sound_manager.play('powerup')
+                    
+                    # Add powerup animation
+                    animation_manager.add_powerup(powerup.x, powerup.y)
+                    
+                    # Add text animation
+                    animation_manager.add_text(powerup.x, powerup.y - 20, message, YELLOW, 24)
+                    
+                    self.powerups.release(powerup)
+                    self.bullets.release(bullet)
+                    break
+
+    def draw(self, alpha=1.0, world=None):
+        """Render the current state; alpha is how far we are between the last two ticks.
+        
+        world is what to draw the playfield from: the game itself, or a
+        snapshot of it taken for pipelined rendering (see pipeline.py).
+        """
+        if world is None:
+            world = self
+        if world.state == PLAYING:
+            # The world is moving, so pause and game over screens must capture it afresh
+            self.static_screens.pop(PAUSED, None)
+            self.static_screens.pop(GAME_OVER, None)
+            
+        if self.dirty_renderer:
+            self.draw_dirty(alpha, world)
+            return
+            
+        self.draw_screen(alpha, world)
+        if frame_profiler.visible:
+            frame_profiler.draw(self.screen)
             
         pygame.display.flip()
         
+    def draw_dirty(self, alpha=1.0, world=None):
+        """Render through the dirty rect renderer, presenting only what changed"""
+        if world is None:
+            world = self
+        renderer = self.dirty_renderer
+        renderer.set_state(world.state)
+        if world.state == PLAYING:
+            rects = self.draw_game(alpha, world)
+        else:
+            if frame_profiler.visible:
+                # The overlay changes every frame, on every screen
+                renderer.invalidate()
+            elif not renderer.full_redraw:
+                # Menus and frozen screens look the same until something invalidates them
+                renderer.skip()
+                return
+            self.draw_screen(alpha, world)
+            rects = []
+            
+        if frame_profiler.visible:
+            rects.append(frame_profiler.draw(self.screen))
+        renderer.present(rects)
+        
+    def draw_screen(self, alpha=1.0, world=None):
+        """Draw the current state's screen, without presenting it"""
+        if world is None:
+            world = self
+        if world.state == MENU:
+            self.draw_static_screen((), self.draw_menu)
+        elif world.state == PLAYING:
+            self.draw_game(alpha, world)
+        elif world.state == GAME_OVER:
+            self.draw_static_screen((self.player.score, self.player.kills, self.wave, self.game_over_reason,
+                                     game_settings.difficulty), self.draw_game_over)
+        elif world.state == PAUSED:
+            self.draw_static_screen((), self.draw_paused)
+        elif world.state == SETTINGS:
+            self.draw_static_screen((game_settings.difficulty, game_settings.fullscreen, game_settings.show_fps,
+                                     game_settings.sound_volume, sound_manager.music_enabled), self.draw_settings)
+            
+    def draw_static_screen(self, inputs, draw):
+        """Blit the current state's composed screen, composing it with draw() when its inputs change"""
+        cached = self.static_screens.get(self.state)
+        if cached and cached[0] == inputs:
+            self.screen.blit(cached[1], (0, 0))
+            return
+            
+        draw()
+        self.static_screens[self.state] = (inputs, self.screen.copy())
+        
+    def draw_paused(self):
+        self.draw_game()  # Draw game in background, frozen on the last tick
+        self.draw_pause_menu()
+        
     def draw_menu(self):
         self.screen.fill(BLACK)
         
         # Draw title
-        title = self.large_font.render("RATPOCALYPSE", True, RED)
-        subtitle = self.font.render("A Survival Defense Shooter", True, WHITE)
+        title = text_cache.render(self.large_font, "RATPOCALYPSE", True, RED)
+        subtitle = text_cache.render(self.font, "A Survival Defense Shooter", True, WHITE)
         
         # Draw menu options with key bindings highlighted
-        start_text = self.font.render("Press [ENTER] to start", True, WHITE)
-        settings_text = self.font.render("Press [S] for settings", True, WHITE)
-        quit_text = self.font.render("Press [ESC] to quit", True, WHITE)
+        start_text = text_cache.render(self.font, "Press [ENTER] to start", True, WHITE)
+        settings_text = text_cache.render(self.font, "Press [S] for settings", True, WHITE)
+        quit_text = text_cache.render(self.font, "Press [ESC] to quit", True, WHITE)
         
         # Position all elements
         self.screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 50))
@@ -448,7 +737,7 @@ class Game:
         self.screen.fill(WHITE)
         
         # Draw title
-        title = self.font.render("SETTINGS", True, BLACK)
+        title = text_cache.render(self.font, "SETTINGS", True, BLACK)
         self.screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 50))
         
         # Calculate grid positions
@@ -460,26 +749,27 @@ class Game:
         bottom_row = 320
         
         # Draw difficulty settings (top-left quadrant)
-        difficulty_title = self.font.render("Difficulty:", True, BLACK)
-        easy_text = self.small_font.render("[1] Easy", True, BLACK if game_settings.difficulty != DIFFICULTY_EASY else GREEN)
-        normal_text = self.small_font.render("[2] Normal", True, BLACK if game_settings.difficulty != DIFFICULTY_NORMAL else GREEN)
-        hard_text = self.small_font.render("[3] Hard", True, BLACK if game_settings.difficulty != DIFFICULTY_HARD else GREEN)
+        difficulty_title = text_cache.render(self.font, "Difficulty:", True, BLACK)
+        easy_text = text_cache.render(self.small_font, "[1] Easy", True, BLACK if game_settings.difficulty != DIFFICULTY_EASY else GREEN)
+        normal_text = text_cache.render(self.small_font, "[2] Normal", True, BLACK if game_settings.difficulty != DIFFICULTY_NORMAL else GREEN)
+        hard_text = text_cache.render(self.small_font, "[3] Hard", True, BLACK if game_settings.difficulty != DIFFICULTY_HARD else GREEN)
         
         # Draw display settings (top-right quadrant)
-        display_title = self.font.render("Display:", True, BLACK)
-        fullscreen_text = self.small_font.render("[F] Fullscreen: " + ("ON" if game_settings.fullscreen else "OFF"), True, BLACK)
+        display_title = text_cache.render(self.font, "Display:", True, BLACK)
+        fullscreen_text = text_cache.render(self.small_font, "[F] Fullscreen: " + ("ON" if game_settings.fullscreen else "OFF"), True, BLACK)
+        show_fps_text = text_cache.render(self.small_font, "[T] FPS display: " + ("ON" if game_settings.show_fps else "OFF"), True, BLACK)
         
         # Draw sound settings (bottom-left quadrant)
-        sound_title = self.font.render("Sound:", True, BLACK)
-        sound_volume_text = self.small_font.render("Volume: " + str(int(game_settings.sound_volume * 100)) + "%", True, BLACK)
-        sound_controls = self.small_font.render("[+/-] Adjust volume", True, BLACK)
+        sound_title = text_cache.render(self.font, "Sound:", True, BLACK)
+        sound_volume_text = text_cache.render(self.small_font, "Volume: " + str(int(game_settings.sound_volume * 100)) + "%", True, BLACK)
+        sound_controls = text_cache.render(self.small_font, "[+/-] Adjust volume", True, BLACK)
         
         # Draw music settings (bottom-right quadrant)
-        music_title = self.font.render("Music:", True, BLACK)
-        music_toggle_text = self.small_font.render("[M] Music: " + ("ON" if sound_manager.music_enabled else "OFF"), True, BLACK)
+        music_title = text_cache.render(self.font, "Music:", True, BLACK)
+        music_toggle_text = text_cache.render(self.small_font, "[M] Music: " + ("ON" if sound_manager.music_enabled else "OFF"), True, BLACK)
         
         # Draw back option
-        back_text = self.font.render("Press [ESC] to return to menu", True, BLACK)
+        back_text = text_cache.render(self.font, "Press [ESC] to return to menu", True, BLACK)
         
         # Position elements in grid layout
         # Top-left quadrant (Difficulty)
@@ -491,6 +781,7 @@ class Game:
         # Top-right quadrant (Display)
         self.screen.blit(display_title, (right_col - display_title.get_width()//2, top_row))
         self.screen.blit(fullscreen_text, (right_col - fullscreen_text.get_width()//2, top_row + 50))
+        self.screen.blit(show_fps_text, (right_col - show_fps_text.get_width()//2, top_row + 80))
         
         # Bottom-left quadrant (Sound)
         self.screen.blit(sound_title, (left_col - sound_title.get_width()//2, bottom_row))
@@ -504,80 +795,83 @@ class Game:
         # Return to menu prompt at the bottom
         self.screen.blit(back_text, (SCREEN_WIDTH//2 - back_text.get_width()//2, SCREEN_HEIGHT - 50))
         
-    def draw_game(self):
-        # Draw background - different colors for left and right of wall
-        pygame.draw.rect(self.screen, LIGHT_GRAY, (0, 0, self.wall.x, SCREEN_HEIGHT))  # Enemy area
-        pygame.draw.rect(self.screen, GRAY, (self.wall.x, 0, SCREEN_WIDTH - self.wall.x, SCREEN_HEIGHT))  # Player area
-        
-        # Draw wall
-        self.wall.draw(self.screen)
+    def draw_game(self, alpha=1.0, world=None):
+        """Draw the playfield, returning the areas drawn over the background layer"""
+        if world is None:
+            world = self
+            
+        # Draw background and wall, pre-rendered as one layer. The dirty rect
+        # renderer only paints it back where last frame drew over it.
+        if self.dirty_renderer:
+            layer = world.wall.get_layer()
+            self.dirty_renderer.restore(self.screen, layer, world.wall.get_rect())
+            rects = [world.wall.draw_hit_effect(self.screen, layer)]
+        else:
+            rects = [world.wall.draw(self.screen)]
         
         # Draw powerups
-        for powerup in self.powerups:
-            powerup.draw(self.screen)
+        for powerup in world.powerups:
+            rects.append(powerup.draw(self.screen))
             
-        # Draw bullets
-        for bullet in self.bullets:
-            bullet.draw(self.screen)
+        # Draw bullets, all in one batch
+        rects.extend(world.bullets.draw(self.screen, alpha, self.dirty_renderer is not None))
             
-        # Draw enemies
-        for enemy in self.enemies:
-            enemy.draw(self.screen)
+        # Draw enemies, all in one batch
+        rects.extend(world.enemies.draw(self.screen, alpha, self.dirty_renderer is not None))
             
         # Draw player
-        self.player.draw(self.screen)
+        rects.append(world.player.draw(self.screen, alpha))
         
-        # Draw animations
-        animation_manager.draw(self.screen)
+        # Draw particles, all in one batch, then animations
+        rects.extend(world.particles.draw(self.screen, alpha, self.dirty_renderer is not None))
+        rects.extend(animation_manager.draw(self.screen, world.animations))
         
         # Draw HUD
-        self.draw_hud()
+        rects.extend(self.draw_hud(world))
 
 
         # Wave timer - centered and more prominent
-        if len(self.enemies) == 0 and self.wave_timer > 0:
+        if len(world.enemies) == 0 and world.wave_timer > 0:
             # Create a gradient-like effect with two overlays
             # First, create a slightly larger background with accent color
-            bg_overlay = pygame.Surface((310, 135), pygame.SRCALPHA)  
-            bg_overlay.fill((255, 165, 0, 160))  # Orange background with transparency
-            self.screen.blit(bg_overlay, (SCREEN_WIDTH//2 - 155, SCREEN_HEIGHT//2 - 56))  # Adjusted position
+            bg_overlay = overlay_cache.get((310, 135), (255, 165, 0, 160))  # Orange background with transparency
+            rects.append(self.screen.blit(bg_overlay, (SCREEN_WIDTH//2 - 155, SCREEN_HEIGHT//2 - 56)))  # Adjusted position
             
             # Then create the main overlay
-            timer_overlay = pygame.Surface((300, 120), pygame.SRCALPHA)
-            timer_overlay.fill((0, 0, 0, 200))  # Darker background for better visibility
+            timer_overlay = overlay_cache.get((300, 120), (0, 0, 0, 200))  # Darker background for better visibility
             self.screen.blit(timer_overlay, (SCREEN_WIDTH//2 - 150, SCREEN_HEIGHT//2 - 50))
             
             # Add a subtle highlight at the top
             pygame.draw.rect(self.screen, (255, 255, 255, 30), (SCREEN_WIDTH//2 - 145, SCREEN_HEIGHT//2 - 45, 290, 5))
             
             # Display next wave text with a glow effect
-            next_wave_text = self.font.render("NEXT WAVE", True, YELLOW)
+            next_wave_text = text_cache.render(self.font, "NEXT WAVE", True, YELLOW)
             # Add subtle glow by drawing the text with transparency underneath
             glow_pos = (SCREEN_WIDTH//2 - next_wave_text.get_width()//2, SCREEN_HEIGHT//2 - 40)
             self.screen.blit(next_wave_text, glow_pos)
             
             # Display wave number
-            wave_text = self.large_font.render(f"Wave {self.wave + 1}", True, WHITE)  # Show next wave number
+            wave_text = text_cache.render(self.large_font, f"Wave {world.wave + 1}", True, WHITE)  # Show next wave number
             self.screen.blit(wave_text, (SCREEN_WIDTH//2 - wave_text.get_width()//2, SCREEN_HEIGHT//2 - 5))
             
             # Display countdown timer
-            countdown_text = self.font.render(f"Starting in: {self.wave_timer // 60 + 1}", True, WHITE)
+            countdown_text = text_cache.render(self.font, f"Starting in: {world.wave_timer // self.tick_rate + 1}", True, WHITE)
             self.screen.blit(countdown_text, (SCREEN_WIDTH//2 - countdown_text.get_width()//2, SCREEN_HEIGHT//2 + 35))
 
         # Controls reminder with key bindings highlighted
-        controls_text = self.small_font.render("[WASD] Move | Mouse: Aim | [LMB] Shoot | [R] Reload | [P/ESC] Pause | [Q] Quit", True, BLACK)
-        self.screen.blit(controls_text, (SCREEN_WIDTH//2 - controls_text.get_width()//2, SCREEN_HEIGHT - 20))
+        controls_text = text_cache.render(self.small_font, "[WASD] Move | Mouse: Aim | [LMB] Shoot | [R] Reload | [P/ESC] Pause | [Q] Quit", True, BLACK)
+        rects.append(self.screen.blit(controls_text, (SCREEN_WIDTH//2 - controls_text.get_width()//2, SCREEN_HEIGHT - 20)))
+        return rects
         
     def draw_pause_menu(self):
         # Draw semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
+        overlay = overlay_cache.get((SCREEN_WIDTH, SCREEN_HEIGHT), (0, 0, 0, 128))
         self.screen.blit(overlay, (0, 0))
         
         # Draw pause menu with key bindings highlighted
-        pause_text = self.large_font.render("PAUSED", True, WHITE)
-        continue_text = self.font.render("Press [ESC] to continue", True, WHITE)
-        quit_text = self.font.render("Press [Q] to quit to menu", True, WHITE)
+        pause_text = text_cache.render(self.large_font, "PAUSED", True, WHITE)
+        continue_text = text_cache.render(self.font, "Press [ESC] to continue", True, WHITE)
+        quit_text = text_cache.render(self.font, "Press [Q] to quit to menu", True, WHITE)
         
         self.screen.blit(pause_text, (SCREEN_WIDTH//2 - pause_text.get_width()//2, SCREEN_HEIGHT//2 - 50))
         self.screen.blit(continue_text, (SCREEN_WIDTH//2 - continue_text.get_width()//2, SCREEN_HEIGHT//2 + 20))
@@ -588,27 +882,26 @@ class Game:
         self.draw_game()
         
         # Draw semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 192))
+        overlay = overlay_cache.get((SCREEN_WIDTH, SCREEN_HEIGHT), (0, 0, 0, 192))
         self.screen.blit(overlay, (0, 0))
         
         # Draw game over text
-        game_over_text = self.large_font.render("GAME OVER", True, RED)
+        game_over_text = text_cache.render(self.large_font, "GAME OVER", True, RED)
         
         # Show reason for game over
-        reason_text = self.font.render(self.game_over_reason, True, WHITE)
+        reason_text = text_cache.render(self.font, self.game_over_reason, True, WHITE)
             
         # Show stats
-        score_text = self.font.render(f"Final Score: {self.player.score}", True, WHITE)
-        kills_text = self.font.render(f"Enemies Killed: {self.player.kills}", True, WHITE)
-        wave_text = self.font.render(f"Survived until wave: {self.wave}", True, WHITE)
+        score_text = text_cache.render(self.font, f"Final Score: {self.player.score}", True, WHITE)
+        kills_text = text_cache.render(self.font, f"Enemies Killed: {self.player.kills}", True, WHITE)
+        wave_text = text_cache.render(self.font, f"Survived until wave: {self.wave}", True, WHITE)
         
         # Show difficulty
         difficulty_names = ["Easy", "Normal", "Hard"]
-        difficulty_text = self.font.render(f"Difficulty: {difficulty_names[game_settings.difficulty]}", True, WHITE)
+        difficulty_text = text_cache.render(self.font, f"Difficulty: {difficulty_names[game_settings.difficulty]}", True, WHITE)
         
         # Show instruction with key binding highlighted
-        instruction = self.font.render("Press [ENTER] to return to menu", True, WHITE)
+        instruction = text_cache.render(self.font, "Press [ENTER] to return to menu", True, WHITE)
         
         # Position all elements
         self.screen.blit(game_over_text, (SCREEN_WIDTH//2 - game_over_text.get_width()//2, SCREEN_HEIGHT//2 - 150))
@@ -619,12 +912,15 @@ class Game:
         self.screen.blit(difficulty_text, (SCREEN_WIDTH//2 - difficulty_text.get_width()//2, SCREEN_HEIGHT//2 + 90))
         self.screen.blit(instruction, (SCREEN_WIDTH//2 - instruction.get_width()//2, SCREEN_HEIGHT//2 + 150))
 
-    def draw_hud(self):
-        # Create a semi-transparent HUD background at the top
+    def draw_hud(self, world=None):
+        """Draw the HUD, returning the areas drawn over"""
+        if world is None:
+            world = self
+            
+        # Create a semi-transparent HUD background at the top, everything else in the bar stays inside it
         hud_height = 60
-        hud_bg = pygame.Surface((SCREEN_WIDTH, hud_height), pygame.SRCALPHA)
-        hud_bg.fill((0, 0, 0, 100))
-        self.screen.blit(hud_bg, (0, 0))
+        hud_bg = overlay_cache.get((SCREEN_WIDTH, hud_height), (0, 0, 0, 100))
+        rects = [self.screen.blit(hud_bg, (0, 0))]
         
         # Draw divider lines - now with 4 equal sections instead of 5
         pygame.draw.line(self.screen, WHITE, (SCREEN_WIDTH//4, 5), (SCREEN_WIDTH//4, hud_height-5), 1)
@@ -633,14 +929,14 @@ class Game:
         
         # Wall health with icon and bar
         wall_icon = "🧱"
-        wall_percent = self.wall.health / self.wall.max_health
+        wall_percent = world.wall.health / world.wall.max_health
         wall_color = GREEN
         if wall_percent < 0.3:
             wall_color = RED
         elif wall_percent < 0.6:
             wall_color = YELLOW
             
-        wall_text = self.small_font.render(f"{wall_icon} {self.wall.health}/{self.wall.max_health}", True, WHITE)
+        wall_text = text_cache.render(self.small_font, f"{wall_icon} {world.wall.health}/{world.wall.max_health}", True, WHITE)
         self.screen.blit(wall_text, (10, 10))
         
         # Wall health bar
@@ -649,11 +945,11 @@ class Game:
         
         # Ammo with icon
         ammo_icon = "🔫"
-        ammo_text = self.small_font.render(f"{ammo_icon} {self.player.ammo}/{self.player.max_ammo}", True, WHITE)
+        ammo_text = text_cache.render(self.small_font, f"{ammo_icon} {world.player.ammo}/{world.player.max_ammo}", True, WHITE)
         self.screen.blit(ammo_text, (SCREEN_WIDTH//4 + 10, 10))
         
         # Ammo bar
-        ammo_percent = self.player.ammo / self.player.max_ammo
+        ammo_percent = world.player.ammo / world.player.max_ammo
         ammo_color = BLUE
         if ammo_percent < 0.3:
             ammo_color = RED
@@ -665,72 +961,159 @@ class Game:
         
         # Wave with icon
         wave_icon = "🌊"
-        wave_text = self.small_font.render(f"{wave_icon} Wave: {self.wave}", True, WHITE)
+        wave_text = text_cache.render(self.small_font, f"{wave_icon} Wave: {world.wave}", True, WHITE)
         self.screen.blit(wave_text, (SCREEN_WIDTH*2//4 + 10, 10))
         
         # Wave indicator dots
         for i in range(5):
-            if i < self.wave % 5:
+            if i < world.wave % 5:
                 pygame.draw.circle(self.screen, YELLOW, (SCREEN_WIDTH*2//4 + 20 + i*20, 35), 5)
             else:
                 pygame.draw.circle(self.screen, (100, 100, 100), (SCREEN_WIDTH*2//4 + 20 + i*20, 35), 5)
         
         # Score with icon
         score_icon = "🏆"
-        score_text = self.small_font.render(f"{score_icon} Score: {self.player.score}", True, WHITE)
+        score_text = text_cache.render(self.small_font, f"{score_icon} Score: {world.player.score}", True, WHITE)
         self.screen.blit(score_text, (SCREEN_WIDTH*3//4 + 10, 10))
         
         # Kills count
-        kills_text = self.small_font.render(f"Kills: {self.player.kills}", True, WHITE)
+        kills_text = text_cache.render(self.small_font, f"Kills: {world.player.kills}", True, WHITE)
         self.screen.blit(kills_text, (SCREEN_WIDTH*3//4 + 10, 35))
         
+        # Quality level, once the governor has had to lower it, just below the score column.
+        # The profiler overlay covers that spot and lists the quality itself
+        if quality_governor.level > 0 and not frame_profiler.visible:
+            quality_text = text_cache.render(self.small_font, f"Quality: {quality_governor.name()}", True, YELLOW)
+            rects.append(self.screen.blit(quality_text, (SCREEN_WIDTH*3//4 + 10, hud_height + 5)))
+        
         # Reload indicator
-        if self.player.reloading:
-            reload_progress = 1 - (self.player.reload_time / self.player.reload_time_max)
+        if world.player.reloading:
+            reload_progress = 1 - (world.player.reload_time / world.player.reload_time_max)
             
             # Create a semi-transparent overlay for reload indicator
-            reload_overlay = pygame.Surface((200, 40), pygame.SRCALPHA)
-            reload_overlay.fill((0, 0, 0, 150))
-            self.screen.blit(reload_overlay, (SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT - 100))
+            reload_overlay = overlay_cache.get((200, 40), (0, 0, 0, 150))
+            rects.append(self.screen.blit(reload_overlay, (SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT - 100)))
             
-            reload_text = self.font.render("RELOADING", True, WHITE)
-            self.screen.blit(reload_text, (SCREEN_WIDTH//2 - reload_text.get_width()//2, SCREEN_HEIGHT - 95))
+            reload_text = text_cache.render(self.font, "RELOADING", True, WHITE)
+            rects.append(self.screen.blit(reload_text, (SCREEN_WIDTH//2 - reload_text.get_width()//2, SCREEN_HEIGHT - 95)))
             
             # Draw reload progress bar
             pygame.draw.rect(self.screen, RED, (SCREEN_WIDTH//2 - 75, SCREEN_HEIGHT - 70, 150, 10))
             pygame.draw.rect(self.screen, GREEN, (SCREEN_WIDTH//2 - 75, SCREEN_HEIGHT - 70, 150 * reload_progress, 10))
             
         # Active powerup indicators
-        if self.player.unlimited_ammo or self.player.fire_rate_boost:
+        if world.player.unlimited_ammo or world.player.fire_rate_boost:
             # Create a semi-transparent overlay for powerup indicators
-            powerup_overlay = pygame.Surface((200, 40), pygame.SRCALPHA)
-            powerup_overlay.fill((0, 0, 0, 150))
-            self.screen.blit(powerup_overlay, (SCREEN_WIDTH//2 - 100, 70))
+            powerup_overlay = overlay_cache.get((200, 40), (0, 0, 0, 150))
+            rects.append(self.screen.blit(powerup_overlay, (SCREEN_WIDTH//2 - 100, 70)))
             
             powerup_text = ""
-            if self.player.unlimited_ammo:
+            if world.player.unlimited_ammo:
                 powerup_text += "∞ UNLIMITED AMMO "
-            if self.player.fire_rate_boost:
+            if world.player.fire_rate_boost:
                 powerup_text += "⚡ RAPID FIRE"
                 
-            active_text = self.small_font.render(powerup_text, True, YELLOW)
-            self.screen.blit(active_text, (SCREEN_WIDTH//2 - active_text.get_width()//2, 80))
+            active_text = text_cache.render(self.small_font, powerup_text, True, YELLOW)
+            rects.append(self.screen.blit(active_text, (SCREEN_WIDTH//2 - active_text.get_width()//2, 80)))
             
             # Draw powerup timer bar
             max_time = 180  # 3 seconds at 60 FPS
-            time_left = max(self.player.unlimited_ammo_time, self.player.fire_rate_boost_time)
+            time_left = max(world.player.unlimited_ammo_time, world.player.fire_rate_boost_time)
             progress = time_left / max_time
             
             pygame.draw.rect(self.screen, (100, 100, 100), (SCREEN_WIDTH//2 - 75, 100, 150, 5))
             pygame.draw.rect(self.screen, YELLOW, (SCREEN_WIDTH//2 - 75, 100, 150 * progress, 5))
+        return rects
+        
+    def draw_snapshot(self, snapshot):
+        """Draw a snapshot published by the simulation thread"""
+        self.draw(snapshot.alpha, snapshot)
         
     def run(self):
+        """Main loop: fixed-timestep simulation with interpolated rendering"""
+        tick_time = 1.0 / self.tick_rate
+        previous = time.perf_counter()
+        
         while True:
+            now = time.perf_counter()
+            self.accumulator += min(now - previous, MAX_FRAME_TIME)
+            previous = now
+            frame_profiler.begin_frame()
+            
+            start = frame_profiler.clock()
             self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
+            frame_profiler.add(EVENTS, start)
+            
+            # Run as many whole ticks as real time allows
+            ticks = 0
+            while self.accumulator >= tick_time and ticks < MAX_TICKS_PER_FRAME:
+                self.accumulator -= tick_time
+                ticks += 1
+            if ticks == MAX_TICKS_PER_FRAME:
+                self.accumulator = min(self.accumulator, tick_time)
+                
+            if self.pipeline and self.state == PLAYING:
+                # The worker runs the ticks while last frame's snapshot draws. Draw time
+                # includes waiting for the worker; its phases are timed on the worker.
+                start = frame_profiler.clock()
+                self.pipeline.step(ticks, self.accumulator / tick_time, self.draw_snapshot)
+                frame_profiler.add(DRAW, start)
+            else:
+                # Anything published belongs to a game that has since stopped moving
+                if self.pipeline:
+                    self.pipeline.reset()
+                    
+                start = frame_profiler.clock()
+                for _ in range(ticks):
+                    self.update()
+                frame_profiler.add(UPDATE, start)
+                
+                # Only interpolate while the world is moving, frozen screens draw the last tick
+                alpha = self.accumulator / tick_time if self.state == PLAYING else 1.0
+                start = frame_profiler.clock()
+                self.draw(alpha)
+                frame_profiler.add(DRAW, start)
+            
+            # Adjust visual quality to the time this frame spent working, not sleeping
+            work_ms = (frame_profiler.clock() - frame_profiler.frame_start) * 1000
+            if self.state == PLAYING and quality_governor.observe(work_ms) and self.dirty_renderer:
+                self.dirty_renderer.invalidate()
+                
+            # Nothing moves on menus and frozen screens, so they don't need a high frame rate
+            fps = self.max_fps
+            if self.state != PLAYING:
+                fps = min(fps, STATIC_SCREEN_FPS) if fps else STATIC_SCREEN_FPS
+            self.clock.tick(fps)
+            frame_profiler.end_frame(quality_governor.level)
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Catpocalypse")
+    parser.add_argument('--record', metavar='FILE', help="record each game's input to FILE")
+    parser.add_argument('--replay', metavar='FILE', help="play back a recorded game")
+    parser.add_argument('--seek-wave', type=int, metavar='N', help="with --replay, skip ahead to wave N")
+    parser.add_argument('--profile-csv', metavar='FILE',
+                        help="dump frame timings to FILE on F4 and on exit")
+    parser.add_argument('--show-fps', action='store_true', help="start with the frame timing overlay shown")
+    parser.add_argument('--dirty-rects', action='store_true', default=None,
+                        help="present only the changed parts of the screen instead of flipping it all")
+    parser.add_argument('--pipelined', action='store_true', default=None,
+                        help="run the simulation on its own thread while the previous frame draws")
+    parser.add_argument('--quality', type=int, choices=range(len(QUALITY_LEVELS)), metavar='LEVEL',
+                        help="fix the quality level, 0 (full) to %d (minimal), instead of adapting it"
+                             % (len(QUALITY_LEVELS) - 1))
+    args = parser.parse_args()
+    
+    game = Game(record_path=args.record, profile_path=args.profile_csv, dirty_rects=args.dirty_rects,
+                pipelined=args.pipelined)
+    if args.show_fps:
+        frame_profiler.visible = True
+    if args.quality is not None:
+        quality_governor.set_level(args.quality)
+    if args.replay:
+        try:
+            game.start_replay(ReplayPlayer.load(args.replay))
+        except (OSError, ReplayError) as e:
+            parser.error(str(e))
+        if args.seek_wave and not game.seek_replay(args.seek_wave):
+            print(f"Replay never reaches wave {args.seek_wave}, playing from the start")
     game.run()
\ No newline at end of file
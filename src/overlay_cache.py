@@ -0,0 +1,43 @@
+import pygame
+
+class OverlayCache:
+    """Translucent panels of a fixed size and color, created once and reused.
+
+    The HUD bar, the reload and power-up panels, the wave timer and the
+    full-screen pause and game over dims are the same every frame, so they
+    are filled once instead of being allocated anew each time. Panels are
+    converted to the display's pixel format for faster blitting, which ties
+    them to the display mode: call clear() after changing it.
+    """
+    def __init__(self):
+        self.panels = {}
+
+        # Counters, see stats()
+        self.builds = 0
+
+    def get(self, size, color):
+        """Return a panel of the given size filled with an RGBA color"""
+        key = (size, color)
+        panel = self.panels.get(key)
+        if panel is None:
+            panel = pygame.Surface(size, pygame.SRCALPHA)
+            panel.fill(color)
+            if pygame.display.get_surface():
+                panel = panel.convert_alpha()
+            self.panels[key] = panel
+            self.builds += 1
+        return panel
+
+    def clear(self):
+        """Drop every panel, they are rebuilt for the new display format on next use"""
+        self.panels.clear()
+
+    def stats(self):
+        """Return the cache counters"""
+        return {
+            'builds': self.builds,
+            'panels': len(self.panels),
+        }
+
+# Create a global instance
+overlay_cache = OverlayCache()
@@ -0,0 +1,124 @@
+import copy
+import threading
+
+from animation import animation_manager
+from particles import particle_system
+
+class Snapshot:
+    """Everything one frame of the playfield draws, copied out of the game.
+
+    Bullet, enemy and particle rows are copied into arrays kept from an
+    older snapshot (see ArrayPool.snapshot); the player, the wall,
+    power-ups and animations are shallow copies, small enough to take
+    whole. The wall copy keeps the live wall's layer cache, so drawing it
+    never rebuilds a layer the game already has. Drawing reads a snapshot like it would the game itself, see
+    Game.draw.
+    """
+    def __init__(self):
+        self.state = None
+        self.alpha = 1.0  # Interpolation factor the snapshot is drawn with
+        self.wave = 0
+        self.wave_timer = 0
+        self.wall = None
+        self.player = None
+        self.powerups = []
+        self.bullets = None
+        self.enemies = None
+        self.animations = []
+        self.particles = None
+
+    def capture(self, game, alpha):
+        """Copy what the playfield draws from the game; returns the snapshot itself"""
+        self.state = game.state
+        self.alpha = alpha
+        self.wave = game.wave
+        self.wave_timer = game.wave_timer
+        self.wall = copy.copy(game.wall)
+        self.player = copy.copy(game.player)
+        self.powerups = game.powerups.copy_items()
+        self.bullets = game.bullets.snapshot(self.bullets)
+        self.enemies = game.enemies.snapshot(self.enemies)
+        self.animations = animation_manager.animations.copy_items()
+        self.particles = particle_system.snapshot(self.particles)
+        return self
+
+class SimulationThread:
+    """Runs the simulation on a worker thread while the main thread draws.
+
+    Each frame the main thread handles input and works out how many ticks
+    are due, then calls step(): the worker runs those ticks and captures
+    a snapshot into the back buffer, while the main thread draws the front
+    one, captured at the end of the previous frame. Frames are therefore
+    shown one frame late. The game is only touched by one thread at a
+    time: input and state changes happen between steps, while the worker
+    waits.
+
+    The threads only truly overlap where the GIL is released: presenting
+    the frame (display flip or update, which can block on the video
+    driver) and large NumPy operations. pygame 2.6 keeps the GIL while
+    blitting, so on a CPU-bound frame they mostly take turns; measure with
+    benchmark.py --pipelined before turning it on.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.buffers = [Snapshot(), Snapshot()]
+        self.front = None  # Snapshot drawn next, None until captured
+        self.back = None  # Snapshot the worker captures into
+        self.ticks = 0
+        self.alpha = 1.0
+        self.error = None  # Exception raised on the worker, re-raised by step()
+        self.stopping = False
+
+        # The main thread releases `start` to hand over a frame, the worker releases `done`
+        self.start = threading.Semaphore(0)
+        self.done = threading.Semaphore(0)
+        self.thread = threading.Thread(target=self.work, name="simulation", daemon=True)
+        self.thread.start()
+
+    def reset(self):
+        """Forget the front snapshot, the next step captures the game as it is first"""
+        self.front = None
+
+    def step(self, ticks, alpha, draw):
+        """Run ticks on the worker while draw(snapshot) draws the last frame's snapshot.
+
+        alpha is the interpolation factor after the ticks, stored with the
+        snapshot they produce.
+        """
+        if self.front is None:
+            # Nothing published yet (the game just started or resumed), draw it as it is now
+            self.front = self.buffers[0].capture(self.game, alpha)
+
+        self.back = self.buffers[1] if self.front is self.buffers[0] else self.buffers[0]
+        self.ticks = ticks
+        self.alpha = alpha
+        self.start.release()
+        try:
+            draw(self.front)
+        finally:
+            self.done.acquire()
+
+        if self.error:
+            error, self.error = self.error, None
+            raise error
+        self.front = self.back
+
+    def stop(self):
+        """End the worker thread once it is idle"""
+        self.stopping = True
+        self.start.release()
+        self.thread.join()
+
+    def work(self):
+        """Worker loop: run the frame's ticks, then publish them as a snapshot"""
+        while True:
+            self.start.acquire()
+            if self.stopping:
+                return
+            try:
+                for _ in range(self.ticks):
+                    self.game.update()
+                self.back.capture(self.game, self.alpha)
+            except Exception as e:
+                self.error = e
+            self.done.release()
@@ -1,7 +1,9 @@
 import pygame
 import math
-import os
 from sound_manager import sound_manager
+from settings import game_settings
+from text_cache import text_cache
+from sprite_cache import sprite_cache, flash, crop_centered, scale_frame, RotationCache
 
 # Colors
 BLACK = (0, 0, 0)
@@ -10,10 +12,24 @@ GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
 ORANGE = (255, 165, 0)
 
+# Sprite files in assets/images
+PLAYER_IDLE_SPRITE = "__Cat_Idle_000.png"
+PLAYER_RUN_SPRITE = "__Cat_Run_000.png"
+GUN_SPRITES = {
+    'default': "pistol.png",  # Default gun (pistol)
+    'fire_rate_boost': "submachine.png",  # Fire rate boost gun (submachine)
+}
+
+# Colors the player can flash, each baked into its own sprite variant
+FLASH_COLORS = (RED, GREEN, BLUE, ORANGE)
+FLASH_ALPHA = 128
+
 class Player:
     def __init__(self, x, y, screen_width, screen_height):
         self.x = x
         self.y = y
+        self.prev_x = x  # Position at the previous tick, for render interpolation
+        self.prev_y = y
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.width = 40
@@ -65,8 +81,8 @@ class Player:
         self.idle_sprite = None
         self.run_sprite = None
         
-        # Gun sprites
-        self.gun_sprites = {
+        # Gun sprites, pre-rotated
+        self.gun_rotations = {
             'default': None,
             'fire_rate_boost': None
         }
@@ -76,66 +92,57 @@ class Player:
         self.load_sprites()
         
     def load_sprites(self):
-        """Load player sprites and prepare animations"""
-        try:
-            # Get the script directory
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            
-            # Get the assets directory path - one level up from script_dir, then into assets
-            assets_dir = os.path.join(os.path.dirname(script_dir), 'assets')
-            
-            # Base paths
-            base_path = os.path.join(assets_dir, "images")
-            gun_path = os.path.join(assets_dir, "images")
-            
-            print(f"Loading player sprites from: {base_path}")
-            print(f"Loading gun sprites from: {gun_path}")
-            
-            # Load the player sprites
-            self.idle_sprite = pygame.image.load(os.path.join(base_path, "__Cat_Idle_000.png")).convert_alpha()
-            self.run_sprite = pygame.image.load(os.path.join(base_path, "__Cat_Run_000.png")).convert_alpha()
-            
-            # Scale the sprites to match player dimensions
-            scale_factor = 0.5  # Adjust as needed
-            self.sprite_width = int(self.width * 2)  # Make sprite wider than player hitbox
-            self.sprite_height = int(self.height * 2)  # Make sprite taller than player hitbox
-            
-            self.idle_sprite = pygame.transform.scale(self.idle_sprite, (self.sprite_width, self.sprite_height))
-            self.run_sprite = pygame.transform.scale(self.run_sprite, (self.sprite_width, self.sprite_height))
-            
-            # Create horizontally flipped versions (mirror images)
-            self.idle_sprite = pygame.transform.flip(self.idle_sprite, True, False)
-            self.run_sprite = pygame.transform.flip(self.run_sprite, True, False)
-            
-            # Load gun sprites
-            try:
-                # Default gun (pistol)
-                default_gun = pygame.image.load(os.path.join(gun_path, "pistol.png")).convert_alpha()
-                # Create horizontally flipped version (mirror image)
-                default_gun = pygame.transform.flip(default_gun, True, False)
-                self.gun_sprites['default'] = default_gun
-                
-                # Fire rate boost gun (submachine)
-                boost_gun = pygame.image.load(os.path.join(gun_path, "submachine.png")).convert_alpha()
-                # Create horizontally flipped version (mirror image)
-                boost_gun = pygame.transform.flip(boost_gun, True, False)
-                self.gun_sprites['fire_rate_boost'] = boost_gun
-                
-                print("Gun sprites loaded and flipped successfully")
-            except Exception as e:
-                print(f"Error loading gun sprites: {e}")
-                # If gun sprites fail to load, we'll use the line drawing fallback
+        """Take player and gun sprites, and their flash variants, from the shared cache"""
+        # Make sprite larger than player hitbox
+        self.sprite_width = int(self.width * 2)
+        self.sprite_height = int(self.height * 2)
+        size = (self.sprite_width, self.sprite_height)
+        
+        self.idle_sprite = sprite_cache.get((PLAYER_IDLE_SPRITE, size),
+                                            lambda: self.build_sprite(PLAYER_IDLE_SPRITE, size))
+        self.run_sprite = sprite_cache.get((PLAYER_RUN_SPRITE, size),
+                                           lambda: self.build_sprite(PLAYER_RUN_SPRITE, size))
+        
+        # If loading fails, use placeholder
+        self.sprite_placeholder = self.idle_sprite is None or self.run_sprite is None
+        if not self.sprite_placeholder:
+            self.idle_flash_sprites = self.flash_variants((PLAYER_IDLE_SPRITE, size), self.idle_sprite)
+            self.run_flash_sprites = self.flash_variants((PLAYER_RUN_SPRITE, size), self.run_sprite)
             
-            # Set sprite placeholder to False since we loaded the sprite
-            self.sprite_placeholder = False
+        # Gun sprites - if these fail to load, we'll use the line drawing fallback
+        step = game_settings.gun_rotation_step
+        for gun_key, file_name in GUN_SPRITES.items():
+            self.gun_rotations[gun_key] = sprite_cache.get((file_name, 'rotations', step),
+                                                           lambda: self.build_gun(file_name, step))
             
-            print("Player sprites loaded and flipped successfully")
-        except Exception as e:
-            print(f"Error loading player sprite: {e}")
-            # If loading fails, use placeholder
-            self.sprite_placeholder = True
+    def build_sprite(self, file_name, size):
+        """Scale a player image and mirror it to face left"""
+        sprite = scale_frame(*sprite_cache.load_image(file_name), size)
+        return pygame.transform.flip(sprite, True, False)
+        
+    def build_gun(self, file_name, step):
+        """Mirror a gun image and pre-render it at every rotation step"""
+        gun, offset, size = sprite_cache.load_image(file_name)
+        
+        # Mirroring moves the visible part to the other side of the frame
+        gun = pygame.transform.flip(gun, True, False)
+        offset = (size[0] - offset[0] - gun.get_width(), offset[1])
+        rotations = RotationCache(crop_centered(gun, offset, size), step)
+        print(f"Pre-rotated {file_name} in {step} degree steps: "
+              f"{rotations.count} frames, {rotations.memory_bytes() // 1024} KB")
+        return rotations
+        
+    def flash_variants(self, key, sprite):
+        """Return the sprite's flash variant for every flash color, baked once"""
+        return {color: sprite_cache.get(key + ('flash', color), lambda: flash(sprite, color, FLASH_ALPHA))
+                for color in FLASH_COLORS}
+        
+    def draw(self, screen, alpha=1.0):
+        """Draw the player, gun and power-up indicators, returning the area drawn over"""
+        # Interpolate between the last two simulation ticks
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
         
-    def draw(self, screen):
         # Determine which sprite to use based on player state
         current_sprite = self.idle_sprite
         if self.is_moving:
@@ -148,53 +155,42 @@ class Player:
         
         if not self.sprite_placeholder and current_sprite:
             # Calculate position to center the sprite on player coordinates
-            sprite_x = self.x - self.sprite_width // 2
-            sprite_y = self.y - self.sprite_height // 2
+            sprite_x = x - self.sprite_width // 2
+            sprite_y = y - self.sprite_height // 2
             
             # Apply flash effect if active
             if self.flash_time > 0 and self.flash_time % 4 < 2:
-                # Create a copy of the sprite and apply a color overlay
-                sprite_copy = current_sprite.copy()
-                overlay = pygame.Surface(sprite_copy.get_size(), pygame.SRCALPHA)
-                overlay.fill((*self.flash_color, 128))  # Add alpha value
-                sprite_copy.blit(overlay, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
-                screen.blit(sprite_copy, (sprite_x, sprite_y))
+                flash_sprites = self.run_flash_sprites if self.is_moving else self.idle_flash_sprites
+                rect = screen.blit(flash_sprites[self.flash_color], (sprite_x, sprite_y))
             else:
-                screen.blit(current_sprite, (sprite_x, sprite_y))
+                rect = screen.blit(current_sprite, (sprite_x, sprite_y))
         else:
             # Draw player placeholder (will be replaced with sprite later)
-            pygame.draw.rect(screen, color, (self.x - self.width//2, self.y - self.height//2, 
+            rect = pygame.draw.rect(screen, color, (x - self.width//2, y - self.height//2, 
                                           self.width, self.height))
             
             # Draw a simple face to indicate this is a placeholder
-            pygame.draw.rect(screen, BLACK, (self.x - self.width//2 + 5, self.y - self.height//2 + 5, 
+            pygame.draw.rect(screen, BLACK, (x - self.width//2 + 5, y - self.height//2 + 5, 
                                           self.width - 10, 15), 1)  # Helmet
-            pygame.draw.rect(screen, BLACK, (self.x - 15, self.y - 10, 
+            pygame.draw.rect(screen, BLACK, (x - 15, y - 10, 
                                           30, 20), 1)  # Face outline
             
             # Draw text indicating this is a placeholder
-            font = pygame.font.SysFont(None, 12)
-            text = font.render("PLAYER", True, BLACK)
-            screen.blit(text, (self.x - text.get_width()//2, self.y))
+            text = text_cache.render(text_cache.font(12), "PLAYER", True, BLACK)
+            rect.union_ip(screen.blit(text, (x - text.get_width()//2, y)))
         
         # Draw player gun - choose between sprite and line drawing
         gun_length = 30
-        end_x = self.x + math.cos(math.radians(self.angle)) * gun_length
-        end_y = self.y + math.sin(math.radians(self.angle)) * gun_length
+        end_x = x + math.cos(math.radians(self.angle)) * gun_length
+        end_y = y + math.sin(math.radians(self.angle)) * gun_length
         
         # Determine which gun sprite to use
         gun_key = 'fire_rate_boost' if self.fire_rate_boost else 'default'
-        gun_sprite = self.gun_sprites.get(gun_key)
+        gun_rotations = self.gun_rotations.get(gun_key)
         
-        if gun_sprite:
-            # Scale gun sprite - INCREASED SIZE
-            gun_scale = 1.0  # Adjust as needed
-            gun_width = int(gun_sprite.get_width() * gun_scale)
-            gun_height = int(gun_sprite.get_height() * gun_scale)
-            scaled_gun = pygame.transform.scale(gun_sprite, (gun_width, gun_height))
-            
-            # Rotate gun sprite to match player's aim angle
-            rotated_gun = pygame.transform.rotate(scaled_gun, -self.angle)  # Negative angle for correct rotation
+        if gun_rotations:
+            # Look up the gun sprite pre-rotated closest to the player's aim angle
+            rotated_gun = gun_rotations.get(self.angle)
             
             # Calculate position to place the gun - adjusted for larger size
             # Offset the gun position to better align with the player
@@ -202,36 +198,41 @@ class Player:
             offset_x = math.cos(math.radians(self.angle)) * offset_distance
             offset_y = math.sin(math.radians(self.angle)) * offset_distance
             
-            gun_x = self.x - rotated_gun.get_width() // 2 + offset_x
-            gun_y = self.y - rotated_gun.get_height() // 2 + offset_y
+            gun_x = x - rotated_gun.get_width() // 2 + offset_x
+            gun_y = y - rotated_gun.get_height() // 2 + offset_y
             
             # Draw the gun sprite
-            screen.blit(rotated_gun, (gun_x, gun_y))
+            rect.union_ip(screen.blit(rotated_gun, (gun_x, gun_y)))
         else:
             # Fallback to line drawing if sprites aren't available
-            pygame.draw.line(screen, BLACK, (self.x, self.y), (end_x, end_y), 5)
+            rect.union_ip(pygame.draw.line(screen, BLACK, (x, y), (end_x, end_y), 5))
         
         # Draw power-up indicators
-        indicator_y = self.y + self.height//2 + 10
+        indicator_y = y + self.height//2 + 10
         indicator_spacing = 12
         
         # Speed boost indicator
         if self.speed_boost_time > 0:
-            pygame.draw.circle(screen, GREEN, (int(self.x - 15), int(indicator_y)), 5)
+            rect.union_ip(pygame.draw.circle(screen, GREEN, (int(x - 15), int(indicator_y)), 5))
             
         # Damage boost indicator
         if self.damage_boost_time > 0:
-            pygame.draw.circle(screen, ORANGE, (int(self.x), int(indicator_y)), 5)
+            rect.union_ip(pygame.draw.circle(screen, ORANGE, (int(x), int(indicator_y)), 5))
             
         # Unlimited ammo indicator
         if self.unlimited_ammo:
-            pygame.draw.circle(screen, BLUE, (int(self.x + 15), int(indicator_y)), 5)
+            rect.union_ip(pygame.draw.circle(screen, BLUE, (int(x + 15), int(indicator_y)), 5))
             
         # Fire rate boost indicator
         if self.fire_rate_boost:
-            pygame.draw.circle(screen, ORANGE, (int(self.x + 30), int(indicator_y)), 5)
+            rect.union_ip(pygame.draw.circle(screen, ORANGE, (int(x + 30), int(indicator_y)), 5))
+        return rect
     
     def update(self, wall_x):
+        # Remember where we were for render interpolation
+        self.prev_x = self.x
+        self.prev_y = self.y
+        
         # Update gun cooldown
         if self.gun_cooldown > 0:
             self.gun_cooldown -= 1
@@ -0,0 +1,155 @@
+import copy
+
+import numpy as np
+
+class Pool:
+    """Pooled container for game entities.
+
+    Live items are stored densely in `items` and each one knows its slot
+    through `pool_index`. release() only marks an item dead, so it is safe to
+    call while iterating; compact() at the end of the tick swap-removes the
+    released items in O(1) each and parks them on a free list, where
+    acquire() picks them up again through their reset() method instead of
+    allocating new objects.
+
+    Items must accept the same arguments in __init__ and reset().
+    """
+    def __init__(self, factory):
+        self.factory = factory
+        self.items = []
+        self.free = []
+        self.released = []
+
+        # Allocation counters - frame_allocations is zeroed by begin_frame()
+        self.frame_allocations = 0
+        self.total_allocations = 0
+
+    def __len__(self):
+        return len(self.items) - len(self.released)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def begin_frame(self):
+        """Start counting allocations for a new frame"""
+        self.frame_allocations = 0
+
+    def count_allocation(self):
+        self.frame_allocations += 1
+        self.total_allocations += 1
+
+    def acquire(self, *args):
+        """Return a live item, reusing a released one when possible"""
+        if self.free:
+            item = self.free.pop()
+            item.reset(*args)
+        else:
+            item = self.factory(*args)
+            self.count_allocation()
+
+        item.pool_index = len(self.items)
+        item.alive = True
+        self.items.append(item)
+        return item
+
+    def release(self, item):
+        """Mark an item dead; it leaves the pool on the next compact()"""
+        if item.alive:
+            item.alive = False
+            self.released.append(item)
+
+    def compact(self):
+        """Swap-remove every released item and return it to the free list"""
+        if not self.released:
+            return
+
+        items = self.items
+        for item in self.released:
+            index = item.pool_index
+            last_index = len(items) - 1
+            last = items.pop()
+            if index != last_index:
+                # Fill the hole with the last item
+                items[index] = last
+                last.pool_index = index
+                self._move(last_index, index)
+            self.free.append(item)
+        self.released.clear()
+
+    def copy_items(self):
+        """Shallow copies of the live items, which stay as they are while the originals change"""
+        return [copy.copy(item) for item in self.items if item.alive]
+
+    def clear(self):
+        """Release every item at once"""
+        for item in self.items:
+            item.alive = False
+        self.free.extend(self.items)
+        self.items.clear()
+        self.released.clear()
+
+    def _move(self, src, dst):
+        """Hook for pools that keep per-item data outside the items themselves"""
+        pass
+
+class ArrayPool(Pool):
+    """Pool whose per-item state lives in NumPy arrays, one row per item.
+
+    Subclasses list their columns in FIELDS as (name, dtype, shape) and the
+    arrays are kept row-aligned with `items` through swap-removes. Growing
+    the arrays counts as an allocation.
+    """
+    FIELDS = ()
+
+    def __init__(self, factory, capacity=64):
+        super().__init__(factory)
+        self.capacity = 0
+        self._resize(capacity)
+
+    def _resize(self, capacity):
+        """Grow every array to the given capacity, keeping live rows"""
+        count = len(self.items)
+        for name, dtype, shape in self.FIELDS:
+            array = np.zeros((capacity,) + shape, dtype=dtype)
+            if count:
+                array[:count] = getattr(self, name)[:count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def next_row(self):
+        """Return the row the next acquired item will occupy, growing if full"""
+        row = len(self.items)
+        if row == self.capacity:
+            self._resize(self.capacity * 2)
+            self.count_allocation()
+        return row
+
+    def snapshot(self, into=None):
+        """Return a frozen copy of the pool for drawing, see pipeline.py.
+
+        The copy shares everything with the pool except the per-item arrays,
+        which hold a copy of the live rows, and the item list. Passing an
+        older snapshot as `into` reuses its arrays when they are big enough,
+        so alternating between two snapshots stops allocating once both
+        have grown to fit.
+        """
+        n = len(self.items)
+        snapshot = copy.copy(self)
+        for name, dtype, shape in self.FIELDS:
+            array = getattr(into, name, None)
+            if array is None or len(array) < n:
+                array = np.empty((self.capacity,) + shape, dtype=dtype)
+            array[:n] = getattr(self, name)[:n]
+            setattr(snapshot, name, array)
+        snapshot.items = self.items[:n]  # Only counted, handles still point at the pool
+        snapshot.free = []
+        snapshot.released = []
+        return snapshot
+
+    def _move(self, src, dst):
+        for name, _, _ in self.FIELDS:
+            array = getattr(self, name)
+            array[dst] = array[src]
@@ -1,6 +1,6 @@
 import pygame
-import random
 import math
+from rng import rng
 
 # Power-up types
 POWERUP_UNLIMITED_AMMO = 0
@@ -8,18 +8,22 @@ POWERUP_FIRE_RATE = 1
 
 class PowerUp:
     def __init__(self, x, y, powerup_type=None):
+        self.radius = 15
+        self.colors = {
+            POWERUP_UNLIMITED_AMMO: (0, 0, 255),    # Blue for unlimited ammo
+            POWERUP_FIRE_RATE: (255, 165, 0)        # Orange for fire rate
+        }
+        self.reset(x, y, powerup_type)
+        
+    def reset(self, x, y, powerup_type=None):
+        """Reinitialise a pooled power-up for a new drop"""
         self.x = x
         self.y = y
         # If powerup_type is not specified, randomly choose one
-        self.type = powerup_type if powerup_type is not None else random.randint(0, 1)
-        self.radius = 15
+        self.type = powerup_type if powerup_type is not None else rng.powerup.randint(0, 1)
         self.pulse_size = 0
         self.pulse_direction = 1
         self.lifetime = 600  # 10 seconds at 60 FPS
-        self.colors = {
-            POWERUP_UNLIMITED_AMMO: (0, 0, 255),    # Blue for unlimited ammo
-            POWERUP_FIRE_RATE: (255, 165, 0)        # Orange for fire rate
-        }
         self.color = self.colors.get(self.type, (255, 255, 0))  # Default to yellow
         
     def update(self):
@@ -34,8 +38,8 @@ class PowerUp:
         self.lifetime -= 1
         
     def draw(self, screen):
-        # Draw the power-up with a pulsing effect
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), 
+        # Draw the power-up with a pulsing effect, the icon stays inside it
+        rect = pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), 
                           int(self.radius + self.pulse_size))
         
         # Draw an icon or symbol based on the power-up type
@@ -54,6 +58,7 @@ class PowerUp:
             points = [(self.x - 3, self.y - 5), (self.x + 2, self.y - 1), 
                      (self.x - 1, self.y + 1), (self.x + 3, self.y + 5)]
             pygame.draw.lines(screen, (255, 255, 255), False, points, 2)
+        return rect
         
     def is_expired(self):
         return self.lifetime <= 0
@@ -81,6 +86,6 @@ class PowerUp:
 
 def spawn_random_powerup(min_x, max_x, min_y, max_y):
     """Spawn a random power-up within the given boundaries"""
-    x = random.randint(min_x, max_x)
-    y = random.randint(min_y, max_y)
+    x = rng.powerup.randint(min_x, max_x)
+    y = rng.powerup.randint(min_y, max_y)
     return PowerUp(x, y)
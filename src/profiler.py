@@ -0,0 +1,156 @@
+import csv
+import time
+import numpy as np
+import pygame
+from text_cache import text_cache
+from quality import QUALITY_LEVELS
+
+# Timed phases, in CSV column order. Update sub-phases are summed over every
+# tick run in the frame, so they add up to (slightly less than) UPDATE.
+PHASES = ('events', 'update', 'animations', 'bullets', 'enemies', 'collisions', 'draw', 'frame')
+EVENTS, UPDATE, ANIMATIONS, BULLETS, ENEMIES, COLLISIONS, DRAW, FRAME = range(len(PHASES))
+
+# Frames of history kept, 10 seconds at 60 FPS
+HISTORY_FRAMES = 600
+
+# Overlay layout
+GRAPH_WIDTH = 200
+GRAPH_HEIGHT = 60
+GRAPH_MAX_MS = 50.0  # Frame time at the top of the graph
+OVERLAY_TOP = 70  # Just below the HUD bar
+TEXT_REFRESH_FRAMES = 15  # Re-render the overlay text 4 times a second at 60 FPS
+
+class FrameProfiler:
+    """Per-phase frame timings in a fixed-size ring buffer.
+
+    Every frame is one row of a preallocated array, so recording costs no
+    allocations. Phases are timed with
+
+        start = frame_profiler.clock()
+        ...
+        frame_profiler.add(UPDATE, start)
+
+    and the buffer can be drawn as an overlay or dumped to CSV.
+    """
+    def __init__(self, capacity=HISTORY_FRAMES):
+        self.clock = time.perf_counter
+        self.samples = np.zeros((capacity, len(PHASES)))  # Milliseconds
+        self.quality = np.zeros(capacity, dtype=np.int8)  # Quality level each frame was drawn at
+        self.current = np.zeros(len(PHASES))
+        self.capacity = capacity
+        self.head = 0  # Row the next frame goes into
+        self.count = 0  # Rows filled so far
+        self.frame_start = self.clock()
+
+        # Overlay state
+        self.visible = False
+        self.font = None
+        self.text_lines = []
+        self.text_age = TEXT_REFRESH_FRAMES
+        self.graph = None
+
+    def begin_frame(self):
+        self.current.fill(0)
+        self.frame_start = self.clock()
+
+    def add(self, phase, start):
+        """Add the time since `start` to a phase of the current frame"""
+        self.current[phase] += (self.clock() - start) * 1000
+
+    def end_frame(self, quality=0):
+        """Store the finished frame, drawn at the given quality level, in the ring buffer"""
+        self.current[FRAME] = (self.clock() - self.frame_start) * 1000
+        self.samples[self.head] = self.current
+        self.quality[self.head] = quality
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+        if self.visible:
+            self.update_graph()
+
+    def history(self, array=None):
+        """Return the recorded frames (or another per-frame array), oldest first"""
+        if array is None:
+            array = self.samples
+        if self.count < self.capacity:
+            return array[:self.count]
+        return np.roll(array, -self.head, axis=0)
+
+    def stats(self):
+        """FPS, average frame time, 1% low frame time and per-phase means in ms"""
+        frames = self.samples[:self.count]
+        frame_times = frames[:, FRAME]
+        mean = frame_times.mean()
+
+        # 1% low: the average of the slowest 1% of frames
+        worst = max(1, self.count // 100)
+        one_percent_low = np.partition(frame_times, self.count - worst)[-worst:].mean()
+        return 1000 / mean, mean, one_percent_low, frames.mean(axis=0)
+
+    def dump_csv(self, path):
+        """Write the buffer to a CSV file, one row per frame"""
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame'] + [phase + '_ms' for phase in PHASES] + ['quality'])
+            for index, (row, quality) in enumerate(zip(self.history(), self.history(self.quality))):
+                writer.writerow([index] + [f"{value:.3f}" for value in row] + [quality])
+        return self.count
+
+    def update_graph(self):
+        """Scroll the frame time graph one pixel and draw the newest frame"""
+        if self.graph is None:
+            self.graph = pygame.Surface((GRAPH_WIDTH, GRAPH_HEIGHT))
+            self.graph.fill((0, 0, 0))
+
+        frame_ms = self.current[FRAME]
+        height = int(min(frame_ms / GRAPH_MAX_MS, 1.0) * GRAPH_HEIGHT)
+
+        # Green up to 60 FPS, yellow up to 30 FPS, red beyond
+        if frame_ms <= 1000 / 60 + 1:
+            color = (0, 200, 0)
+        elif frame_ms <= 1000 / 30 + 1:
+            color = (220, 200, 0)
+        else:
+            color = (220, 0, 0)
+
+        self.graph.scroll(-1, 0)
+        self.graph.fill((0, 0, 0), (GRAPH_WIDTH - 1, 0, 1, GRAPH_HEIGHT))
+        self.graph.fill(color, (GRAPH_WIDTH - 1, GRAPH_HEIGHT - height, 1, height))
+
+    def draw(self, screen):
+        """Draw the timing overlay in the top right corner, under the HUD, returning the area drawn over"""
+        if not self.count:
+            return None
+        if self.font is None:
+            self.font = text_cache.font(20)
+
+        # Text only changes a few times a second, so it isn't re-rendered every frame
+        self.text_age += 1
+        if self.text_age >= TEXT_REFRESH_FRAMES:
+            self.text_age = 0
+            fps, mean, one_percent_low, phases = self.stats()
+            lines = [
+                f"FPS {fps:.0f}  frame {mean:.1f} ms  1% low {one_percent_low:.1f} ms",
+                f"events {phases[EVENTS]:.2f}  update {phases[UPDATE]:.2f}  draw {phases[DRAW]:.2f} ms",
+                f"anim {phases[ANIMATIONS]:.2f}  bullets {phases[BULLETS]:.2f}  "
+                f"enemies {phases[ENEMIES]:.2f}  coll {phases[COLLISIONS]:.2f}",
+                f"quality {QUALITY_LEVELS[self.quality[self.head - 1]]['name']}",
+            ]
+            self.text_lines = [self.font.render(line, True, (255, 255, 255), (0, 0, 0)) for line in lines]
+
+        x = screen.get_width() - GRAPH_WIDTH - 10
+        y = OVERLAY_TOP
+        rect = pygame.Rect(x, y, GRAPH_WIDTH, 0)
+        if self.graph:
+            rect.union_ip(screen.blit(self.graph, (x, y)))
+            # 60 FPS reference line
+            line_y = y + GRAPH_HEIGHT - int(1000 / 60 / GRAPH_MAX_MS * GRAPH_HEIGHT)
+            pygame.draw.line(screen, (80, 80, 80), (x, line_y), (x + GRAPH_WIDTH - 1, line_y))
+            y += GRAPH_HEIGHT + 4
+        for text in self.text_lines:
+            rect.union_ip(screen.blit(text, (screen.get_width() - text.get_width() - 10, y)))
+            y += text.get_height()
+        return rect
+
+# Create a global instance
+frame_profiler = FrameProfiler()
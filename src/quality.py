@@ -0,0 +1,107 @@
+import numpy as np
+
+# Quality levels, best first. Each level turns off one more group of
+# costly visuals; the simulation is never touched, only what is drawn.
+QUALITY_LEVELS = (
+    {'name': 'Full', 'trails': True, 'wobble': True, 'health_bars': True, 'effects': True, 'bricks': True},
+    # Bullets drop their fading trails
+    {'name': 'High', 'trails': False, 'wobble': True, 'health_bars': True, 'effects': True, 'bricks': True},
+    # Enemies stop wobbling and lose their health bars
+    {'name': 'Medium', 'trails': False, 'wobble': False, 'health_bars': False, 'effects': True, 'bricks': True},
+    # No explosion, hit or particle effects
+    {'name': 'Low', 'trails': False, 'wobble': False, 'health_bars': False, 'effects': False, 'bricks': True},
+    # Plain wall without the brick pattern
+    {'name': 'Minimal', 'trails': False, 'wobble': False, 'health_bars': False, 'effects': False, 'bricks': False},
+)
+
+# Frames averaged before each decision, 1 second at 60 FPS
+WINDOW_FRAMES = 60
+
+# Hysteresis band, as a share of the frame budget: step down when the
+# average frame takes longer than DEGRADE_RATIO of it, and only step back
+# up after RECOVER_WINDOWS windows in a row under RECOVER_RATIO of it
+DEGRADE_RATIO = 0.9
+RECOVER_RATIO = 0.5
+RECOVER_WINDOWS = 3
+
+class QualityGovernor:
+    """Steps visual quality down and back up to keep frame time within budget.
+
+    Feed it the time each frame spent working (not sleeping in clock.tick)
+    with observe(); drawing code asks enabled('trails') and so on.
+    """
+    def __init__(self, target_fps=60):
+        self.level = 0
+        self.adaptive = True  # False pins the current level
+        self.set_target_fps(target_fps)
+
+        # Rolling window of frame work times in ms
+        self.window = np.zeros(WINDOW_FRAMES)
+        self.filled = 0
+        self.good_windows = 0
+
+        # Counters, see stats()
+        self.changes = 0
+
+    def set_target_fps(self, fps):
+        """Set the frame rate to budget for, 0 meaning uncapped (budgeted as 60 FPS)"""
+        self.budget_ms = 1000 / (fps or 60)
+
+    def set_level(self, level, adaptive=False):
+        """Force a level, by default also stopping adaptation"""
+        self.level = max(0, min(level, len(QUALITY_LEVELS) - 1))
+        self.adaptive = adaptive
+        self.filled = 0
+        self.good_windows = 0
+
+    def enabled(self, feature):
+        """Whether a visual feature is drawn at the current level"""
+        return QUALITY_LEVELS[self.level][feature]
+
+    def name(self):
+        return QUALITY_LEVELS[self.level]['name']
+
+    def observe(self, work_ms):
+        """Record one frame's work time; returns True if the level changed"""
+        if not self.adaptive:
+            return False
+
+        self.window[self.filled] = work_ms
+        self.filled += 1
+        if self.filled < WINDOW_FRAMES:
+            return False
+
+        # A full window: decide, then start the next one from scratch
+        average = self.window.mean()
+        self.filled = 0
+        if average > self.budget_ms * DEGRADE_RATIO:
+            self.good_windows = 0
+            return self.step(1)
+        if average < self.budget_ms * RECOVER_RATIO:
+            self.good_windows += 1
+            if self.good_windows >= RECOVER_WINDOWS:
+                self.good_windows = 0
+                return self.step(-1)
+        else:
+            self.good_windows = 0
+        return False
+
+    def step(self, direction):
+        level = max(0, min(self.level + direction, len(QUALITY_LEVELS) - 1))
+        if level == self.level:
+            return False
+        self.level = level
+        self.changes += 1
+        return True
+
+    def stats(self):
+        """Return the current level and how often it changed"""
+        return {
+            'level': self.level,
+            'name': self.name(),
+            'adaptive': self.adaptive,
+            'changes': self.changes,
+        }
+
+# Create a global instance
+quality_governor = QualityGovernor()
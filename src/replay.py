@@ -0,0 +1,173 @@
+"""Deterministic input recording and replay.
+
+A game is fully determined by its RNG master seed, its difficulty and the
+input state consumed by each tick, so a replay stores just those. Each
+tick packs into five bytes (aim point as two int16s plus a flags byte) and
+the body is zlib-compressed on save.
+
+File layout (little-endian):
+
+    header   magic b"CATR", version u8, seed u64, difficulty u8,
+             tick_rate u16, tick count u32, index entry count u16
+    index    (wave u16, tick u32) per entry - the first tick of each wave
+    body     zlib-compressed tick records
+"""
+import struct
+import zlib
+
+MAGIC = b"CATR"
+VERSION = 1
+
+HEADER = struct.Struct("<4sBQBHIH")
+INDEX_ENTRY = struct.Struct("<HI")
+TICK = struct.Struct("<hhB")
+
+# Tick flag bits
+FIRE = 1 << 0
+MOVE_UP = 1 << 1
+MOVE_DOWN = 1 << 2
+MOVE_LEFT = 1 << 3
+MOVE_RIGHT = 1 << 4
+RELOAD = 1 << 5
+
+class ReplayError(Exception):
+    """Raised when a replay file can't be read"""
+
+class InputRecorder:
+    """Captures the input state of every simulated tick"""
+    def __init__(self, seed, difficulty, tick_rate):
+        self.seed = seed
+        self.difficulty = difficulty
+        self.tick_rate = tick_rate
+        self.ticks = 0
+        self.data = bytearray()
+        self.wave_index = []  # (wave, first tick) pairs
+        self.last_wave = 0
+
+    def capture(self, game):
+        """Record the input the game is about to consume this tick.
+
+        The aim point is rounded to whole pixels in the game as well, so the
+        live run sees exactly what playback will.
+        """
+        if game.wave != self.last_wave:
+            self.last_wave = game.wave
+            self.wave_index.append((game.wave, self.ticks))
+
+        mouse_x = int(round(game.mouse_pos[0]))
+        mouse_y = int(round(game.mouse_pos[1]))
+        game.mouse_pos = (mouse_x, mouse_y)
+
+        player = game.player
+        flags = 0
+        if game.mouse_pressed:
+            flags |= FIRE
+        if player.moving_up:
+            flags |= MOVE_UP
+        if player.moving_down:
+            flags |= MOVE_DOWN
+        if player.moving_left:
+            flags |= MOVE_LEFT
+        if player.moving_right:
+            flags |= MOVE_RIGHT
+        if game.reload_requested:
+            flags |= RELOAD
+
+        self.data += TICK.pack(mouse_x, mouse_y, flags)
+        self.ticks += 1
+
+    def save(self, path):
+        """Write the recording to a replay file"""
+        header = HEADER.pack(MAGIC, VERSION, self.seed, self.difficulty, self.tick_rate,
+                             self.ticks, len(self.wave_index))
+        index = b"".join(INDEX_ENTRY.pack(wave, tick) for wave, tick in self.wave_index)
+        with open(path, 'wb') as f:
+            f.write(header)
+            f.write(index)
+            f.write(zlib.compress(bytes(self.data), 9))
+
+class ReplayPlayer:
+    """Feeds recorded input back into a game, one tick at a time"""
+    def __init__(self, seed, difficulty, tick_rate, data, wave_index):
+        self.seed = seed
+        self.difficulty = difficulty
+        self.tick_rate = tick_rate
+        self.data = data
+        self.ticks = len(data) // TICK.size
+        self.wave_index = dict(wave_index)
+        self.position = 0  # Next tick to play
+
+    @classmethod
+    def load(cls, path):
+        """Read a replay file"""
+        with open(path, 'rb') as f:
+            raw = f.read()
+
+        if len(raw) < HEADER.size:
+            raise ReplayError(f"{path} is too short to be a replay")
+        magic, version, seed, difficulty, tick_rate, ticks, index_count = HEADER.unpack_from(raw)
+        if magic != MAGIC:
+            raise ReplayError(f"{path} is not a replay file")
+        if version != VERSION:
+            raise ReplayError(f"{path} has unsupported replay version {version}")
+
+        offset = HEADER.size
+        wave_index = []
+        for _ in range(index_count):
+            wave_index.append(INDEX_ENTRY.unpack_from(raw, offset))
+            offset += INDEX_ENTRY.size
+
+        try:
+            data = zlib.decompress(raw[offset:])
+        except zlib.error as e:
+            raise ReplayError(f"{path} has a corrupt body: {e}")
+        if len(data) != ticks * TICK.size:
+            raise ReplayError(f"{path} is truncated")
+
+        return cls(seed, difficulty, tick_rate, data, wave_index)
+
+    @property
+    def finished(self):
+        return self.position >= self.ticks
+
+    def apply(self, game):
+        """Overwrite the game's input with the next recorded tick.
+
+        Returns False once the recording has run out.
+        """
+        if self.finished:
+            return False
+
+        mouse_x, mouse_y, flags = TICK.unpack_from(self.data, self.position * TICK.size)
+        self.position += 1
+
+        game.mouse_pos = (mouse_x, mouse_y)
+        game.mouse_pressed = bool(flags & FIRE)
+        game.reload_requested = bool(flags & RELOAD)
+
+        player = game.player
+        player.moving_up = bool(flags & MOVE_UP)
+        player.moving_down = bool(flags & MOVE_DOWN)
+        player.moving_left = bool(flags & MOVE_LEFT)
+        player.moving_right = bool(flags & MOVE_RIGHT)
+        return True
+
+    def wave_tick(self, wave):
+        """Return the tick at which a wave started, or None if it was never reached"""
+        return self.wave_index.get(wave)
+
+    def seek(self, game, wave):
+        """Fast-forward the game, without drawing, to the start of a wave.
+
+        Seeking only goes forward from the current tick. Returns False if
+        the recording never reached that wave.
+        """
+        target = self.wave_tick(wave)
+        if target is None:
+            return False
+        while self.position < target:
+            position = self.position
+            game.update()
+            if self.position == position:
+                break  # The game stopped consuming input, e.g. it's over
+        return True
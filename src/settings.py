@@ -13,6 +13,12 @@ class Settings:
         self.sound_volume = 0.7
         self.music_volume = 0.5
         self.fullscreen = False
+        self.max_fps = 60  # Render frame cap, 0 for uncapped
+        self.show_fps = False  # Frame timing overlay, toggled with F3
+        self.gun_rotation_step = 2  # Degrees between the gun's pre-rotated sprites
+        self.dirty_rects = False  # Present only the changed parts of the screen, see dirty_renderer.py
+        self.pipelined = False  # Run the simulation on a worker thread, see pipeline.py
+        self.adaptive_quality = True  # Drop visual detail when frames run over budget, see quality.py
         
         # Difficulty multipliers
         self.difficulty_settings = {
@@ -56,6 +62,12 @@ class Settings:
                     self.sound_volume = data.get('sound_volume', 0.7)
                     self.music_volume = data.get('music_volume', 0.5)
                     self.fullscreen = data.get('fullscreen', False)
+                    self.max_fps = data.get('max_fps', 60)
+                    self.show_fps = data.get('show_fps', False)
+                    self.gun_rotation_step = data.get('gun_rotation_step', 2)
+                    self.dirty_rects = data.get('dirty_rects', False)
+                    self.pipelined = data.get('pipelined', False)
+                    self.adaptive_quality = data.get('adaptive_quality', True)
             except:
                 print("Error loading settings, using defaults")
                 
@@ -65,7 +77,13 @@ class Settings:
             'difficulty': self.difficulty,
             'sound_volume': self.sound_volume,
             'music_volume': self.music_volume,
-            'fullscreen': self.fullscreen
+            'fullscreen': self.fullscreen,
+            'max_fps': self.max_fps,
+            'show_fps': self.show_fps,
+            'gun_rotation_step': self.gun_rotation_step,
+            'dirty_rects': self.dirty_rects,
+            'pipelined': self.pipelined,
+            'adaptive_quality': self.adaptive_quality
         }
         
         try:
@@ -90,6 +108,12 @@ class Settings:
         self.save_settings()
         return self.fullscreen
         
+    def toggle_show_fps(self):
+        """Toggle the frame timing overlay"""
+        self.show_fps = not self.show_fps
+        self.save_settings()
+        return self.show_fps
+        
     def set_sound_volume(self, volume):
         """Set sound volume (0.0 to 1.0)"""
         self.sound_volume = max(0.0, min(1.0, volume))
@@ -0,0 +1,68 @@
+import math
+
+# Default cell size in pixels - the 800x600 playfield becomes a 16x12 grid,
+# and even a tank enemy's padded hitbox only spans a couple of cells
+DEFAULT_CELL_SIZE = 50
+
+class SpatialGrid:
+    """Uniform-grid spatial index used as a collision broad-phase.
+
+    Items are inserted into every cell their bounding box touches, so a
+    point query only needs to look at a single cell. Positions outside the
+    playfield are clamped onto the edge cells.
+    """
+    def __init__(self, width, height, cell_size=DEFAULT_CELL_SIZE):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.cols = max(1, int(math.ceil(width / cell_size)))
+        self.rows = max(1, int(math.ceil(height / cell_size)))
+
+        # Flat list of cells, indexed by row * cols + col
+        self.cells = [[] for _ in range(self.cols * self.rows)]
+
+        # Cells that hold items, so clearing only touches what was used
+        self.used_cells = []
+
+    def clear(self):
+        """Remove all items from the grid"""
+        cells = self.cells
+        for index in self.used_cells:
+            cells[index].clear()
+        self.used_cells.clear()
+
+    def _col(self, x):
+        col = int(x // self.cell_size)
+        if col < 0:
+            return 0
+        if col >= self.cols:
+            return self.cols - 1
+        return col
+
+    def _row(self, y):
+        row = int(y // self.cell_size)
+        if row < 0:
+            return 0
+        if row >= self.rows:
+            return self.rows - 1
+        return row
+
+    def insert(self, item, x, y, half_width, half_height):
+        """Insert an item into every cell its bounding box touches"""
+        min_col = self._col(x - half_width)
+        max_col = self._col(x + half_width)
+        min_row = self._row(y - half_height)
+        max_row = self._row(y + half_height)
+
+        cells = self.cells
+        for row in range(min_row, max_row + 1):
+            base = row * self.cols
+            for index in range(base + min_col, base + max_col + 1):
+                cell = cells[index]
+                if not cell:
+                    self.used_cells.append(index)
+                cell.append(item)
+
+    def query_point(self, x, y):
+        """Return the items stored in the cell containing (x, y), in insertion order"""
+        return self.cells[self._row(y) * self.cols + self._col(x)]
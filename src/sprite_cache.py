@@ -0,0 +1,276 @@
+import pygame
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Texture atlas built by atlas_packer.py, in the assets directory
+ATLAS_IMAGE = 'atlas.png'
+ATLAS_INDEX = 'atlas.json'
+
+class SpriteCache:
+    """Process-wide store of loaded images and their processed variants.
+
+    Each image file is read from disk and converted once; derived sprites
+    (scaled, tinted, flipped...) are built once per key by a caller-supplied
+    function and shared by every entity that asks for the same key.
+    """
+    def __init__(self):
+        # Get the script directory
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+
+        # Get the assets directory path - one level up from script_dir, then into images
+        self.assets_dir = os.path.join(os.path.dirname(script_dir), 'assets')
+        self.images_dir = os.path.join(self.assets_dir, 'images')
+
+        self.images = {}  # File name -> (converted image, offset, original size), see load_image()
+        self.atlas = None  # File name -> (subsurface of the atlas, offset, original size), read on first use
+        self.variants = {}  # Key -> built sprite, or None if building failed
+
+        # Counters, see stats()
+        self.disk_reads = 0
+        self.builds = 0
+
+    def load_image(self, file_name):
+        """Return a converted image from assets/images, reading it only the first time.
+
+        Returns (image, offset, size): images packed into the texture atlas
+        are subsurfaces of it, trimmed to their visible pixels, which sit at
+        offset in an original frame of the given size. Anything else is read
+        from its own file and fills its whole frame. See scale_frame() and
+        crop_centered() for using a trimmed image as if it were whole.
+        """
+        if self.atlas is None:
+            self.load_atlas()
+
+        entry = self.images.get(file_name)
+        if entry is None:
+            entry = self.atlas.get(file_name)
+        if entry is None:
+            path = os.path.join(self.images_dir, file_name)
+            print(f"Loading sprite: {path}")
+            image = pygame.image.load(path).convert_alpha()
+            self.disk_reads += 1
+            entry = (image, (0, 0), image.get_size())
+        self.images[file_name] = entry
+        return entry
+
+    def load_atlas(self):
+        """Read and convert the texture atlas in one go, if atlas_packer.py has built it"""
+        self.atlas = {}
+        index_path = os.path.join(self.assets_dir, ATLAS_INDEX)
+        if not os.path.exists(index_path):
+            return
+
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+            path = os.path.join(self.assets_dir, index['image'])
+            print(f"Loading atlas: {path}")
+            atlas = pygame.image.load(path).convert_alpha()
+            self.disk_reads += 1
+        except Exception as e:
+            print(f"Error loading atlas, reading images separately: {e}")
+            return
+
+        # Sprites stay subsurfaces, so the atlas is the only copy of their pixels
+        for file_name, entry in index['sprites'].items():
+            # An image changed since packing is read from its own file until the atlas is rebuilt
+            source = os.path.join(self.images_dir, file_name)
+            if os.path.exists(source) and image_changed(source, entry):
+                print(f"Atlas is out of date for {file_name}, run atlas_packer.py")
+                continue
+            self.atlas[file_name] = (atlas.subsurface(entry['rect']), tuple(entry['offset']), tuple(entry['size']))
+
+    def get(self, key, build):
+        """Return the sprite for key, calling build() to make it on first use.
+
+        A failed build is cached as None, so a missing asset is reported once
+        and the caller falls back to its placeholder from then on.
+        """
+        if key in self.variants:
+            return self.variants[key]
+
+        try:
+            sprite = build()
+        except Exception as e:
+            print(f"Error building sprite {key}: {e}")
+            sprite = None
+        self.variants[key] = sprite
+        self.builds += 1
+        return sprite
+
+    def memory_bytes(self):
+        """Approximate pixel memory held by the cached variants"""
+        total = 0
+        for variant in self.variants.values():
+            if isinstance(variant, (RotationCache, SpriteSheet)):
+                total += variant.memory_bytes()
+            elif variant is not None:
+                total += surface_bytes(variant)
+        return total
+
+    def stats(self):
+        """Return the cache counters"""
+        return {
+            'disk_reads': self.disk_reads,
+            'builds': self.builds,
+            'images': len(self.images),
+            'atlas': len(self.atlas or {}),
+            'variants': len(self.variants),
+            'kb': self.memory_bytes() / 1024,
+        }
+
+class RotationCache:
+    """A sprite pre-rotated at every multiple of a fixed angle step.
+
+    get() snaps the angle to the nearest step, so drawing a rotated sprite
+    is a list lookup instead of a transform.rotate call.
+    """
+    def __init__(self, sprite, step):
+        self.step = step
+        self.count = int(round(360 / step))
+
+        # Angles are screen angles (y down), so rotate clockwise like the game does
+        self.frames = [pygame.transform.rotate(sprite, -i * step) for i in range(self.count)]
+
+    def get(self, angle):
+        """Return the frame closest to angle, in degrees"""
+        return self.frames[int(round(angle / self.step)) % self.count]
+
+    def memory_bytes(self):
+        return sum(surface_bytes(frame) for frame in self.frames)
+
+class SpriteSheet:
+    """A sequence of frames packed side by side into one surface.
+
+    Frames may differ in size; each is a subsurface of the sheet, so
+    indexing the sheet gives a surface ready to blit.
+    """
+    def __init__(self, frames):
+        width = sum(frame.get_width() for frame in frames)
+        height = max((frame.get_height() for frame in frames), default=0)
+        self.sheet = pygame.Surface((width, height), pygame.SRCALPHA)
+
+        self.frames = []
+        x = 0
+        for frame in frames:
+            self.sheet.blit(frame, (x, 0))
+            self.frames.append(self.sheet.subsurface((x, 0), frame.get_size()))
+            x += frame.get_width()
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, index):
+        return self.frames[index]
+
+    def memory_bytes(self):
+        return surface_bytes(self.sheet)
+
+def surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+def file_hash(path):
+    """SHA-256 of a file's contents, to tell whether an image changed since packing"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def image_changed(path, entry):
+    """Tell whether an image differs from its atlas index entry.
+
+    Size and modification time settle it without reading the file; only an
+    image of the same size touched since packing (by a checkout or a copy)
+    is hashed and compared with the packed contents.
+    """
+    stat = os.stat(path)
+    if stat.st_size != entry['bytes']:
+        return True
+    if stat.st_mtime_ns == entry['mtime_ns']:
+        return False
+    return file_hash(path) != entry['sha256']
+
+def scale_frame(sprite, offset, size, new_size):
+    """Scale a sprite's original frame to new_size, reading only its visible part.
+
+    sprite is the visible part of a frame of the given size, at offset, as
+    returned by SpriteCache.load_image. The result matches scaling the
+    whole frame with pygame.transform.scale pixel for pixel, without ever
+    building the whole frame at its original size.
+    """
+    if sprite.get_size() == tuple(size):
+        return pygame.transform.scale(sprite, new_size)
+
+    frame = pygame.Surface(new_size, pygame.SRCALPHA)
+    frame.fill((0, 0, 0, 0))
+
+    # transform.scale takes each pixel from (x * width // new_width, y * height // new_height)
+    # of the source; pick the scaled pixels that land on the visible part
+    columns = _scaled_span(offset[0], sprite.get_width(), size[0], new_size[0])
+    rows = _scaled_span(offset[1], sprite.get_height(), size[1], new_size[1])
+    if len(columns) and len(rows):
+        source_x = columns * size[0] // new_size[0] - offset[0]
+        source_y = rows * size[1] // new_size[1] - offset[1]
+        area = (slice(columns[0], columns[-1] + 1), slice(rows[0], rows[-1] + 1))
+        pixels = pygame.surfarray.pixels3d(frame)
+        pixels[area] = pygame.surfarray.array3d(sprite)[source_x[:, None], source_y]
+        del pixels  # Unlock the surface
+        alpha = pygame.surfarray.pixels_alpha(frame)
+        alpha[area] = pygame.surfarray.array_alpha(sprite)[source_x[:, None], source_y]
+        del alpha
+    return frame
+
+def _scaled_span(start, length, size, new_size):
+    """Scaled coordinates whose source pixel falls in [start, start + length)"""
+    first = -(-start * new_size // size)
+    last = -(-(start + length) * new_size // size)
+    return np.arange(first, last)
+
+def crop_centered(sprite, offset=(0, 0), size=None):
+    """Trim transparent margins while keeping the sprite's center in place.
+
+    Rotations turn about the center, so the crop is symmetric around it:
+    the sprite still lines up exactly where the uncropped one would. A
+    trimmed sprite is cropped around the center of its original frame,
+    given by offset and size like scale_frame().
+    """
+    frame = pygame.Rect(-offset[0], -offset[1], *(size or sprite.get_size()))
+    bounds = sprite.get_bounding_rect()
+    center_x = frame.centerx
+    center_y = frame.centery
+    half_width = max(center_x - bounds.left, bounds.right - center_x)
+    half_height = max(center_y - bounds.top, bounds.bottom - center_y)
+    rect = pygame.Rect(center_x - half_width, center_y - half_height, half_width * 2, half_height * 2).clip(frame)
+
+    cropped = pygame.Surface(rect.size, pygame.SRCALPHA)
+    cropped.fill((0, 0, 0, 0))
+    cropped.blit(sprite, (-rect.x, -rect.y), special_flags=pygame.BLEND_RGBA_MAX)
+    return cropped
+
+def tint(sprite, color, alpha=100):
+    """Return a copy of sprite multiplied by a semi-transparent color"""
+    tinted_sprite = sprite.copy()
+
+    # Create a surface with the tint color
+    overlay = pygame.Surface(tinted_sprite.get_size(), pygame.SRCALPHA)
+    overlay.fill((color[0], color[1], color[2], alpha))
+
+    # Apply the tint
+    tinted_sprite.blit(overlay, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    return tinted_sprite
+
+def flash(sprite, color, alpha):
+    """Return a copy of sprite with a semi-transparent color added on top"""
+    flashed_sprite = sprite.copy()
+
+    # Create a surface with the flash color
+    overlay = pygame.Surface(flashed_sprite.get_size(), pygame.SRCALPHA)
+    overlay.fill((color[0], color[1], color[2], alpha))
+
+    # Apply the flash
+    flashed_sprite.blit(overlay, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+    return flashed_sprite
+
+# Create a global instance
+sprite_cache = SpriteCache()
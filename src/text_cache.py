@@ -0,0 +1,62 @@
+import pygame
+from collections import OrderedDict
+
+# Rendered text surfaces kept before the least recently used is dropped
+DEFAULT_CAPACITY = 256
+
+class TextCache:
+    """Shared fonts and an LRU cache of rendered text.
+
+    Fonts are created once per (name, size) instead of going through the
+    system font lookup every time. Rendered surfaces are keyed by (font,
+    text, antialias, color, background); static labels are rendered once,
+    and changing ones (score, ammo) age out of the cache as they change.
+    Cached surfaces are shared, so callers must not draw on them.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+
+        # Counters, see stats()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def font(self, size, name=None):
+        """Return the shared font for a name and size, None being pygame's default font"""
+        font = self.fonts.get((name, size))
+        if font is None:
+            font = self.fonts[(name, size)] = pygame.font.SysFont(name, size)
+        return font
+
+    def render(self, font, text, antialias, color, background=None):
+        """Cached equivalent of font.render(text, antialias, color, background)"""
+        key = (font, text, antialias, color, background)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self.surfaces[key] = font.render(text, antialias, color, background)
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def stats(self):
+        """Return the cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self.surfaces),
+            'fonts': len(self.fonts),
+        }
+
+# Create a global instance
+text_cache = TextCache()
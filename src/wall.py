@@ -1,11 +1,48 @@
 import pygame
 from animation import animation_manager
+from quality import quality_governor
 
 # Colors
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 BLACK = (0, 0, 0)
 BROWN = (139, 69, 19)
+FLASH_BROWN = (200, 100, 50)
+MORTAR = (100, 50, 20)
+
+# Playfield background either side of the wall
+ENEMY_AREA_COLOR = (200, 200, 200)
+PLAYER_AREA_COLOR = (100, 100, 100)
+
+class WallLayers:
+    """Pre-rendered background and wall, keyed by (flashing, bricks drawn).
+
+    Shallow copies of the wall, like the pipelined snapshots, share this
+    object, so a layer built while drawing a copy stays cached for the
+    live wall and the build count covers both.
+    """
+    def __init__(self):
+        self.layers = {}
+        self.builds = 0
+        
+    def get(self, key, build):
+        """Return the layer for key, building it the first time"""
+        layer = self.layers.get(key)
+        if layer is None:
+            layer = self.layers[key] = build(*key)
+            self.builds += 1
+        return layer
+        
+    def clear(self):
+        """Drop every layer, after the display format changed"""
+        self.layers.clear()
+        
+    def stats(self):
+        """Return the cache counters"""
+        return {
+            'builds': self.builds,
+            'layers': len(self.layers),
+        }
 
 class Wall:
     def __init__(self, screen_width, screen_height):
@@ -21,33 +58,75 @@ class Wall:
         self.hit_flash = 0
         self.hit_y = 0
         
-    def draw(self, screen):
-        # Draw wall with hit flash effect
-        color = BROWN
+        # Pre-rendered background and wall, shared with copies of the wall
+        self.layers = WallLayers()
+        
+    def update(self):
+        """Count down the hit flash, once per simulation tick"""
         if self.hit_flash > 0:
-            color = (200, 100, 50) if self.hit_flash % 2 == 0 else BROWN
             self.hit_flash -= 1
             
-            # Draw hit effect
-            pygame.draw.circle(screen, RED, (int(self.x - self.width//2), int(self.hit_y)), 
-                              int(10 * (1 - self.hit_flash / 10)), 2)
-            
-        # Draw wall
-        pygame.draw.rect(screen, color, (self.x - self.width//2, 0, self.width, self.height))
-        
-        # Draw brick pattern
-        for y in range(0, self.height, 20):
-            pygame.draw.line(screen, (100, 50, 20), 
-                            (self.x - self.width//2, y), 
-                            (self.x + self.width//2, y), 1)
+    def draw(self, screen):
+        """Draw the playfield background and the wall from the cached layer.
+
+        Returns the area the hit effect was drawn over, or None.
+        """
+        layer = self.get_layer()
+        screen.blit(layer, (0, 0))
+        return self.draw_hit_effect(screen, layer)
+        
+    def get_layer(self):
+        """Return the pre-rendered background and wall for the current flash state"""
+        flashing = self.hit_flash > 0 and self.hit_flash % 2 == 0
+        bricks = quality_governor.enabled('bricks')
+        return self.layers.get((flashing, bricks), self.build_layer)
+        
+    def get_rect(self):
+        """Return the wall's area of the screen, the only part that differs between layers"""
+        return pygame.Rect(self.x - self.width//2, 0, self.width, self.height)
+        
+    def draw_hit_effect(self, screen, layer):
+        """Draw the hit effect over the layer, returning the area drawn over or None"""
+        if self.hit_flash <= 0:
+            return None
             
-            # Alternate brick pattern
-            offset = 0 if (y // 20) % 2 == 0 else self.width // 2
-            for x in range(offset, self.width, self.width):
-                pygame.draw.line(screen, (100, 50, 20), 
-                                (self.x - self.width//2 + x, y), 
-                                (self.x - self.width//2 + x, y + 20), 1)
-    
+        # Draw hit effect, growing as the flash runs out
+        rect = pygame.draw.circle(screen, RED, (int(self.x - self.width//2), int(self.hit_y)), 
+                                  int(10 * (1 - (self.hit_flash - 1) / 10)), 2)
+        
+        # The effect sits behind the wall, so put the wall back over it
+        wall_rect = self.get_rect()
+        screen.blit(layer, wall_rect.topleft, wall_rect)
+        return rect
+        
+    def build_layer(self, flashing, bricks=True):
+        """Render the background and the brick wall into a screen-sized surface"""
+        layer = pygame.Surface((self.screen_width, self.screen_height)).convert()
+        
+        # Draw background - different colors for left and right of wall
+        pygame.draw.rect(layer, ENEMY_AREA_COLOR, (0, 0, self.x, self.screen_height))  # Enemy area
+        pygame.draw.rect(layer, PLAYER_AREA_COLOR, (self.x, 0, self.screen_width - self.x, self.screen_height))  # Player area
+        
+        # Draw wall with hit flash effect
+        color = FLASH_BROWN if flashing else BROWN
+        pygame.draw.rect(layer, color, (self.x - self.width//2, 0, self.width, self.height))
+        
+        # Draw brick pattern, left out at the lowest quality level
+        if bricks:
+            for y in range(0, self.height, 20):
+                pygame.draw.line(layer, MORTAR, 
+                                (self.x - self.width//2, y), 
+                                (self.x + self.width//2, y), 1)
+                
+                # Alternate brick pattern
+                offset = 0 if (y // 20) % 2 == 0 else self.width // 2
+                for x in range(offset, self.width, self.width):
+                    pygame.draw.line(layer, MORTAR, 
+                                    (self.x - self.width//2 + x, y), 
+                                    (self.x - self.width//2 + x, y + 20), 1)
+                    
+        return layer
+        
     def take_damage(self, damage):
         self.health -= damage
         self.hit_flash = 10  # Flash for 10 frames